@@ -6,6 +6,7 @@ import os
 import sys
 import asyncio
 import hashlib
+import io
 import json
 import logging
 import uuid
@@ -44,6 +45,7 @@ from src.models.music_analyzer_models import (
 )
 from src.managers.faiss_manager import get_faiss_manager, FAISSManager
 from src.managers.lyrics_search_manager import get_lyrics_manager, LyricsSearchManager
+from src.managers.minio_client import get_minio_client
 from src.utils.lyrics_search_enhanced import get_enhanced_lyrics_manager, EnhancedLyricsSearchManager
 from src.models.gemma_manager import get_gemma_manager, GemmaManager
 from src.models.multi_model_manager import get_multi_model_manager, MultiModelManager
@@ -150,17 +152,12 @@ async def lifespan(app: FastAPI):
     
     # Initialize MinIO
     global minio_client
-    minio_client = Minio(
-        MINIO_CONFIG["endpoint"],
-        access_key=MINIO_CONFIG["access_key"],
-        secret_key=MINIO_CONFIG["secret_key"],
-        secure=MINIO_CONFIG["secure"]
-    )
+    minio_client = get_minio_client()
     
     # Create bucket if not exists
     try:
-        if not minio_client.bucket_exists(MINIO_CONFIG["bucket_name"]):
-            minio_client.make_bucket(MINIO_CONFIG["bucket_name"])
+        if not await asyncio.to_thread(minio_client.bucket_exists, MINIO_CONFIG["bucket_name"]):
+            await asyncio.to_thread(minio_client.make_bucket, MINIO_CONFIG["bucket_name"])
             logger.info(f"Created MinIO bucket: {MINIO_CONFIG['bucket_name']}")
     except Exception as e:
         logger.error(f"MinIO error: {e}")
@@ -199,8 +196,8 @@ async def lifespan(app: FastAPI):
     try:
         gemma_manager = get_gemma_manager()
         logger.info("Gemma manager initialized")
-        # Load model asynchronously
-        asyncio.create_task(enhanced_lyrics_manager.initialize_gemma())
+        # Load model and warm the search session asynchronously
+        asyncio.create_task(enhanced_lyrics_manager.prewarm())
     except Exception as e:
         logger.warning(f"Gemma initialization failed: {e}")
     
@@ -218,6 +215,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down Music Analyzer API...")
     await redis_client.close()
     await db_manager.close()
+    await enhanced_lyrics_manager.close()
     
     # Save FAISS index
     if faiss_manager:
@@ -356,7 +354,7 @@ async def health_check():
     
     # Check MinIO
     try:
-        minio_client.list_buckets()
+        await asyncio.to_thread(minio_client.list_buckets)
         health_status["services"]["minio"] = True
     except:
         pass
@@ -425,10 +423,11 @@ async def upload_file(
     
     # Upload to MinIO
     try:
-        minio_client.put_object(
+        await asyncio.to_thread(
+            minio_client.put_object,
             MINIO_CONFIG["bucket_name"],
             f"original/{genre}/{file_id}_{file.filename}",
-            data=content,
+            data=io.BytesIO(content),
             length=len(content),
             content_type=f"audio/{file_ext[1:]}"
         )
@@ -1010,22 +1009,64 @@ async def generate_with_model(
         raise HTTPException(500, str(e))
 
 # Export endpoints
+# Archive exports are spooled (in memory up to EXPORT_SPOOL_MAX_SIZE, then on
+# disk) and streamed back in chunks instead of being held as one bytes object
+ARCHIVE_EXPORT_FORMATS = {'zip', 'tar.gz', 'mono_tar.gz'}
+EXPORT_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+EXPORT_STREAM_CHUNK_SIZE = 1024 * 1024
+
+def _spooled_export_response(spool, export_data: Dict[str, Any], media_type: str) -> StreamingResponse:
+    """Stream an archive export written into spool, closing the spool afterwards"""
+    spool.seek(0)
+    
+    def iter_chunks():
+        try:
+            while chunk := spool.read(EXPORT_STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            spool.close()
+    
+    return StreamingResponse(
+        iter_chunks(),
+        media_type=media_type,
+        headers={
+            'Content-Disposition': f'attachment; filename="{export_data["filename"]}"'
+        }
+    )
+
 @app.get("/api/v2/export/{file_id}")
 async def export_file(
     file_id: str,
     format: str = Query("json", description="Export format: json, csv, xlsx, zip, tar.gz, mono_tar.gz"),
+    compressor: str = Query("gzip", description="Tar compressor: gzip, pigz or zstd"),
     credentials: HTTPBasicCredentials = Depends(verify_credentials)
 ):
     """Export music file data in various formats"""
-    from src.utils.music_analyzer_export import get_exporter
+    from src.utils.music_analyzer_export import get_exporter, ARCHIVE_TYPES
     from fastapi.responses import Response
     
-    exporter = get_exporter()
+    exporter = get_exporter(db_manager)
     
     if format not in exporter.supported_formats:
         raise HTTPException(400, f"Unsupported format. Choose from: {exporter.supported_formats}")
     
+    if compressor not in ARCHIVE_TYPES:
+        raise HTTPException(400, f"Unsupported compressor. Choose from: {list(ARCHIVE_TYPES)}")
+    
     try:
+        if format in ARCHIVE_EXPORT_FORMATS:
+            spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+            try:
+                export_data = await exporter.export_music_file(
+                    file_id, format, fileobj=spool, compressor=compressor
+                )
+            except BaseException:
+                spool.close()
+                raise
+            return _spooled_export_response(
+                spool, export_data, export_data.get('content_type', 'application/octet-stream')
+            )
+        
         export_data = await exporter.export_music_file(file_id, format)
         
         # Set appropriate content type
@@ -1051,21 +1092,38 @@ async def export_file(
 async def export_batch(
     file_ids: List[str] = Body(..., description="List of file IDs to export"),
     format: str = Body("json", description="Export format: json, csv, xlsx, tar.gz, mono_tar.gz"),
+    compressor: str = Body("gzip", description="Tar compressor: gzip, pigz or zstd"),
     credentials: HTTPBasicCredentials = Depends(verify_credentials)
 ):
     """Export multiple music files"""
-    from src.utils.music_analyzer_export import get_exporter
+    from src.utils.music_analyzer_export import get_exporter, ARCHIVE_TYPES
     from fastapi.responses import Response
     
-    exporter = get_exporter()
+    exporter = get_exporter(db_manager)
     
     if not file_ids:
         raise HTTPException(400, "No file IDs provided")
     
+    if compressor not in ARCHIVE_TYPES:
+        raise HTTPException(400, f"Unsupported compressor. Choose from: {list(ARCHIVE_TYPES)}")
+    
     if len(file_ids) > 100:
         raise HTTPException(400, "Maximum 100 files can be exported at once")
     
     try:
+        if format != 'json':
+            spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+            try:
+                export_data = await exporter.export_batch(
+                    file_ids, format, fileobj=spool, compressor=compressor
+                )
+            except BaseException:
+                spool.close()
+                raise
+            return _spooled_export_response(
+                spool, export_data, export_data.get('content_type', 'application/octet-stream')
+            )
+        
         export_data = await exporter.export_batch(file_ids, format)
         
         return Response(
@@ -1088,7 +1146,7 @@ async def export_search_history(
     from src.utils.music_analyzer_export import get_exporter
     from fastapi.responses import Response
     
-    exporter = get_exporter()
+    exporter = get_exporter(db_manager)
     
     try:
         export_data = await exporter.export_search_history(search_id, format)
@@ -50,7 +50,9 @@ MINIO_CONFIG = {
     "access_key": "minio_admin",
     "secret_key": "minio_secret_2025",
     "bucket_name": "music-analyzer",
-    "secure": False
+    "secure": False,
+    # gzip level for mono tar.gz exports
+    "tar_compresslevel": 1
 }
 
 # Model configuration
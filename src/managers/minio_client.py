@@ -0,0 +1,41 @@
+# Copyright © 2025 David Gornshtein @Eveara Ltd. All rights reserved.
+"""
+Shared MinIO client for Music Analyzer
+"""
+import urllib3
+from minio import Minio
+
+from src.config.music_analyzer_config import MINIO_CONFIG
+
+# Connection pool shared by every MinIO call in the process; minio's default
+# pool keeps only 10 connections per host, so concurrent exports and uploads
+# would otherwise keep discarding sockets and reconnecting
+MINIO_POOL_NUM_POOLS = 16
+MINIO_POOL_MAXSIZE = 64
+
+def _create_http_client() -> urllib3.PoolManager:
+    """Create the urllib3 pool used by the MinIO client"""
+    return urllib3.PoolManager(
+        num_pools=MINIO_POOL_NUM_POOLS,
+        maxsize=MINIO_POOL_MAXSIZE,
+        block=False,
+        timeout=urllib3.Timeout(connect=5, read=300),
+        retries=urllib3.Retry(total=5, backoff_factor=0.2,
+                              status_forcelist=[500, 502, 503, 504]),
+    )
+
+# Singleton instance
+_minio_client = None
+
+def get_minio_client() -> Minio:
+    """Get or create the process-wide MinIO client"""
+    global _minio_client
+    if _minio_client is None:
+        _minio_client = Minio(
+            MINIO_CONFIG["endpoint"],
+            access_key=MINIO_CONFIG["access_key"],
+            secret_key=MINIO_CONFIG["secret_key"],
+            secure=MINIO_CONFIG["secure"],
+            http_client=_create_http_client()
+        )
+    return _minio_client
@@ -31,14 +31,23 @@ async def download_all_models():
     # Download Phi-4 models
     models_to_download = ["phi-4-multimodal", "phi-4-reasoning"]
     
-    for model_type in models_to_download:
-        if not status["models"][model_type]["downloaded"]:
-            print(f"\n📥 Downloading {model_type}...")
-            success = await manager.download_model(model_type)
-            if success:
-                print(f"✓ {model_type} downloaded successfully")
-            else:
-                print(f"✗ Failed to download {model_type}")
+    pending = [m for m in models_to_download if not status["models"][m]["downloaded"]]
+    for model_type in pending:
+        print(f"\n📥 Downloading {model_type}...")
+    
+    # Downloads are independent, so run them concurrently
+    results = await asyncio.gather(
+        *(manager.download_model(model_type) for model_type in pending),
+        return_exceptions=True
+    )
+    
+    for model_type, result in zip(pending, results):
+        if isinstance(result, Exception):
+            print(f"✗ Failed to download {model_type}: {result}")
+        elif result:
+            print(f"✓ {model_type} downloaded successfully")
+        else:
+            print(f"✗ Failed to download {model_type}")
     
     print("\n✅ Download phase complete")
 
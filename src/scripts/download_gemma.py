@@ -5,6 +5,13 @@ Download Gemma model for local use
 """
 import os
 import sys
+import importlib.util
+
+# Use the multi-connection Rust downloader when it is installed; this must be
+# set before huggingface_hub is imported
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 from huggingface_hub import snapshot_download, login
 from pathlib import Path
 from dotenv import load_dotenv
@@ -43,17 +50,23 @@ def download_gemma_model():
             local_dir=str(local_dir),
             local_dir_use_symlinks=False,
             resume_download=True,
+            max_workers=16,
             token=hf_token
         )
         
         print(f"\n✓ Model downloaded to: {downloaded_path}")
         
-        # List downloaded files
+        # List downloaded files; collect first so printing doesn't
+        # interleave with the directory walk
+        downloaded = []
+        for root, _, files in os.walk(local_dir):
+            for name in files:
+                size_mb = os.stat(os.path.join(root, name)).st_size / (1024**2)
+                downloaded.append((name, size_mb))
+        
         print("\nDownloaded files:")
-        for file in local_dir.rglob("*"):
-            if file.is_file():
-                size_mb = file.stat().st_size / (1024**2)
-                print(f"  - {file.name} ({size_mb:.1f} MB)")
+        for name, size_mb in downloaded:
+            print(f"  - {name} ({size_mb:.1f} MB)")
         
         # Update .env with local model path
         env_path = Path("/home/davegornshtein/parakeet-tdt-deployment/.env")
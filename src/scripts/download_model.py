@@ -7,8 +7,16 @@ Supports multiple download methods
 
 import os
 import sys
+import json
 import argparse
+import importlib.util
 from pathlib import Path
+
+# Use the multi-connection Rust downloader when it is installed; this must be
+# set before huggingface_hub is imported
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 import torch
 from huggingface_hub import snapshot_download, hf_hub_download
 import requests
@@ -23,6 +31,7 @@ def download_from_huggingface(repo_id: str, local_dir: str):
             local_dir=local_dir,
             local_dir_use_symlinks=False,
             resume_download=True,
+            max_workers=16,
             token=os.getenv("HF_TOKEN")  # Optional: for private repos
         )
         print(f"✓ Model downloaded to {local_dir}")
@@ -31,6 +40,67 @@ def download_from_huggingface(repo_id: str, local_dir: str):
         print(f"✗ Error downloading from Hugging Face: {e}")
         return False
 
+def _unshare_tensors(state_dict: dict) -> dict:
+    """Copy tensors that alias another tensor's storage
+    
+    safetensors refuses to save tensors sharing memory (tied weights such as
+    embed_tokens/lm_head), and .contiguous() returns the same tensor when it
+    is already contiguous, so aliases have to be cloned explicitly.
+    """
+    seen_storages = set()
+    result = {}
+    for name, tensor in state_dict.items():
+        storage = tensor.untyped_storage().data_ptr()
+        if storage in seen_storages:
+            tensor = tensor.clone()
+        else:
+            seen_storages.add(storage)
+            tensor = tensor.contiguous()
+        result[name] = tensor
+    return result
+
+def convert_bin_to_safetensors(model_dir: str):
+    """Convert pickled PyTorch checkpoints to safetensors so loads can use mmap"""
+    try:
+        from safetensors.torch import save_file
+    except ImportError:
+        print("⚠ safetensors not installed, keeping .bin weights")
+        return
+
+    model_path = Path(model_dir)
+    bin_paths = [*model_path.rglob("pytorch_model*.bin"), *model_path.rglob("model.bin")]
+    converted = []
+    for bin_path in sorted(bin_paths):
+        target = bin_path.with_name(bin_path.name.replace("pytorch_model", "model", 1)).with_suffix(".safetensors")
+        print(f"Converting {bin_path.name} -> {target.name}...")
+        try:
+            state_dict = torch.load(bin_path, map_location="cpu")
+            save_file(_unshare_tensors(state_dict), str(target), metadata={"format": "pt"})
+        except Exception as e:
+            # Keep every .bin checkpoint (a sharded index must point at one
+            # format); they still load, just without mmap
+            print(f"⚠ Could not convert {bin_path.name}, keeping .bin weights: {e}")
+            target.unlink(missing_ok=True)
+            for _, converted_target in converted:
+                converted_target.unlink(missing_ok=True)
+            return
+        converted.append((bin_path, target))
+    
+    for bin_path, _ in converted:
+        bin_path.unlink()
+    
+    # Sharded checkpoints also need their index pointed at the new files
+    for index_path in model_path.rglob("pytorch_model.bin.index.json"):
+        with open(index_path) as f:
+            index = json.load(f)
+        index["weight_map"] = {
+            k: v.replace("pytorch_model", "model", 1).replace(".bin", ".safetensors")
+            for k, v in index.get("weight_map", {}).items()
+        }
+        with open(index_path.with_name("model.safetensors.index.json"), "w") as f:
+            json.dump(index, f, indent=2)
+        index_path.unlink()
+
 def download_from_nvidia_ngc():
     """Download from NVIDIA NGC (if available)"""
     # This would require NGC API key
@@ -40,26 +110,29 @@ def download_from_nvidia_ngc():
 
 def verify_model_files(model_dir: str):
     """Verify that essential model files are present"""
-    model_path = Path(model_dir)
     required_files = [
         "config.json",
-        "model.safetensors",  # or model.bin
+        "model.safetensors",
         "tokenizer.json"
     ]
     
-    missing = []
-    for file in required_files:
-        if not (model_path / file).exists():
-            # Check alternative names
-            if file == "model.safetensors" and (model_path / "model.bin").exists():
-                continue
-            missing.append(file)
+    # One directory listing instead of a stat per required file; sizes come
+    # from the same pass
+    try:
+        with os.scandir(model_dir) as entries:
+            sizes = {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        sizes = {}
+    
+    missing = [file for file in required_files if file not in sizes]
     
     if missing:
         print(f"⚠ Missing files: {', '.join(missing)}")
         return False
     
     print("✓ All model files verified")
+    for file in required_files:
+        print(f"  - {file} ({sizes[file] / 1024**2:.1f} MB)")
     return True
 
 def test_model_loading(model_dir: str):
@@ -116,6 +189,9 @@ def main():
         download_from_nvidia_ngc()
     
     if success:
+        # Make sure weights load through the safetensors fast path
+        convert_bin_to_safetensors(args.model_dir)
+        
         # Verify files
         verify_model_files(args.model_dir)
         
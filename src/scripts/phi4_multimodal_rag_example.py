@@ -19,10 +19,48 @@ from azure.ai.inference.models import (
     ImageDetailLevel,
 )
 from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
 from azure.search.documents import SearchClient
-from azure.search.documents.models import VectorizableTextQuery
-from typing import List, Optional
+from azure.search.documents.models import VectorizableTextQuery, VectorizedQuery
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import base64
+import functools
+import importlib.util
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@functools.lru_cache(maxsize=32)
+def _read_audio(audio_path: str, mtime_ns: int):
+    """Decode an audio file straight into a mono float32 buffer (cached per mtime)"""
+    import numpy as np
+    import soundfile as sf
+    
+    with sf.SoundFile(audio_path) as f:
+        sample_rate = f.samplerate
+        shape = (f.frames, f.channels) if f.channels > 1 else (f.frames,)
+        audio_data = np.empty(shape, dtype=np.float32)
+        f.read(out=audio_data, dtype='float32')
+    
+    # Downmix to mono here so the processor gets a contiguous float32 buffer
+    # it can use as-is instead of copying
+    if audio_data.ndim == 2:
+        audio_data = audio_data.mean(axis=1, dtype=np.float32)
+    return np.ascontiguousarray(audio_data), sample_rate
+
+
+def load_audio(audio_path: str):
+    """
+    Load audio as mono float32, reusing the decoded buffer while the file is unchanged.
+    
+    Args:
+        audio_path: Path to the audio file
+        
+    Returns:
+        Tuple of (audio_data, sample_rate)
+    """
+    return _read_audio(audio_path, os.stat(audio_path).st_mtime_ns)
 
 
 class Phi4MultimodalRAG:
@@ -30,13 +68,22 @@ class Phi4MultimodalRAG:
     A class for performing RAG with Phi-4-multimodal-instruct and Azure AI Search.
     """
     
+    # Local model and processor, loaded once on first use and shared by all
+    # instances
+    _local_model = None
+    _local_processor = None
+    
+    # Maximum number of (query, top) results kept by retrieve_documents
+    RETRIEVAL_CACHE_SIZE = 1024
+    
     def __init__(
         self,
         inference_endpoint: str,
         inference_key: str,
         search_endpoint: str,
         search_index: str,
-        search_key: str
+        search_key: str,
+        embedding_model: Optional[str] = None
     ):
         """
         Initialize the RAG system with Azure endpoints.
@@ -47,11 +94,21 @@ class Phi4MultimodalRAG:
             search_endpoint: Azure AI Search endpoint
             search_index: Name of the search index
             search_key: API key for search endpoint
+            embedding_model: Optional sentence-transformers model used to embed
+                queries locally instead of vectorizing them server-side
+                (e.g. "sentence-transformers/all-MiniLM-L6-v2")
         """
+        # Keep-alive connection pool so repeated completions reuse TLS sessions
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        
         # Initialize chat client for Phi-4-multimodal
         self.chat_client = ChatCompletionsClient(
             endpoint=inference_endpoint,
             credential=AzureKeyCredential(inference_key),
+            transport=RequestsTransport(session=session, session_owner=False),
         )
         
         # Initialize search client
@@ -60,6 +117,35 @@ class Phi4MultimodalRAG:
             index_name=search_index,
             credential=AzureKeyCredential(search_key)
         )
+        
+        # LRU cache of retrieval results keyed on (query, top)
+        self._retrieval_cache: "OrderedDict[Tuple[str, int], List[str]]" = OrderedDict()
+        
+        # Local query embedder, loaded lazily on first retrieval
+        self.embedding_model = embedding_model
+        self._embedder = None
+        self._embedding_cache: Dict[str, List[float]] = {}
+    
+    def _build_vector_query(self, query: str, top: int):
+        """Build the vector query, embedding locally when configured"""
+        if not self.embedding_model:
+            return VectorizableTextQuery(
+                text=query,
+                k_nearest_neighbors=top,
+                fields="text_vector"  # Assumes your index has a text_vector field
+            )
+        
+        if query not in self._embedding_cache:
+            if self._embedder is None:
+                from sentence_transformers import SentenceTransformer
+                self._embedder = SentenceTransformer(self.embedding_model)
+            self._embedding_cache[query] = self._embedder.encode(query).tolist()
+        
+        return VectorizedQuery(
+            vector=self._embedding_cache[query],
+            k_nearest_neighbors=top,
+            fields="text_vector"
+        )
     
     def retrieve_documents(self, query: str, top: int = 3) -> List[str]:
         """
@@ -72,12 +158,13 @@ class Phi4MultimodalRAG:
         Returns:
             List of document contents
         """
+        key = (query, top)
+        if key in self._retrieval_cache:
+            self._retrieval_cache.move_to_end(key)
+            return list(self._retrieval_cache[key])
+        
         # Create vector query for semantic search
-        vector_query = VectorizableTextQuery(
-            text=query,
-            k_nearest_neighbors=top,
-            fields="text_vector"  # Assumes your index has a text_vector field
-        )
+        vector_query = self._build_vector_query(query, top)
         
         # Perform search
         results = self.search_client.search(
@@ -89,7 +176,60 @@ class Phi4MultimodalRAG:
         
         # Extract document contents
         documents = [doc["content"] for doc in results]
-        return documents
+        
+        self._retrieval_cache[key] = documents
+        if len(self._retrieval_cache) > self.RETRIEVAL_CACHE_SIZE:
+            self._retrieval_cache.popitem(last=False)
+        return list(documents)
+    
+    def retrieve_documents_batch(self, queries: List[str], top: int = 3) -> List[List[str]]:
+        """
+        Retrieve documents for several queries with a single search request.
+        
+        All queries are sent as vector queries of one hybrid search, so the
+        HTTPS round trip is paid once instead of once per query. Returned
+        documents are assigned back to the query whose terms they overlap
+        most, keeping at most ``top`` documents per query.
+        
+        Args:
+            queries: Search queries
+            top: Number of documents to retrieve per query
+            
+        Returns:
+            List of document content lists, one per query
+        """
+        if not queries:
+            return []
+        if len(queries) == 1:
+            return [self.retrieve_documents(queries[0], top=top)]
+        
+        vector_queries = [self._build_vector_query(query, top) for query in queries]
+        
+        results = self.search_client.search(
+            search_text=" | ".join(queries),
+            vector_queries=vector_queries,
+            select=["content"],
+            top=top * len(queries)
+        )
+        
+        # Results come back ordered by @search.score; hand each document to
+        # the best-matching query that still has room
+        query_terms = [set(query.lower().split()) for query in queries]
+        buckets: List[List[str]] = [[] for _ in queries]
+        for doc in results:
+            content = doc["content"]
+            doc_terms = set(content.lower().split())
+            ranked = sorted(
+                range(len(queries)),
+                key=lambda i: len(query_terms[i] & doc_terms),
+                reverse=True
+            )
+            for i in ranked:
+                if len(buckets[i]) < top:
+                    buckets[i].append(content)
+                    break
+        
+        return buckets
     
     def format_context(self, documents: List[str]) -> str:
         """
@@ -236,24 +376,40 @@ class Phi4MultimodalRAG:
         Example of multimodal RAG using local Phi-4 model (not Azure endpoint).
         This shows how to combine retrieval with local model inference.
         """
+        import torch
         from transformers import AutoModelForCausalLM, AutoProcessor
         from PIL import Image
-        import soundfile as sf
         
         # Retrieve relevant documents
         documents = self.retrieve_documents(query)
         context = self.format_context(documents)
         
-        # Load local model
-        model_id = "microsoft/Phi-4-multimodal-instruct"
-        processor = AutoProcessor.from_pretrained(model_id, trust_remote_code=True)
-        model = AutoModelForCausalLM.from_pretrained(
-            model_id,
-            device_map="cuda",
-            torch_dtype="auto",
-            trust_remote_code=True,
-            attn_implementation='flash_attention_2',
-        )
+        # Load local model once; later calls reuse the GPU-resident weights
+        if Phi4MultimodalRAG._local_model is None:
+            model_id = "microsoft/Phi-4-multimodal-instruct"
+            # FlashAttention-2 needs SM80+ and flash-attn; SDPA otherwise
+            has_fa2 = (
+                torch.cuda.is_available()
+                and torch.cuda.get_device_capability()[0] >= 8
+                and importlib.util.find_spec("flash_attn") is not None
+            )
+            Phi4MultimodalRAG._local_processor = AutoProcessor.from_pretrained(
+                model_id, trust_remote_code=True
+            )
+            model = AutoModelForCausalLM.from_pretrained(
+                model_id,
+                device_map="cuda",
+                torch_dtype="auto",
+                trust_remote_code=True,
+                attn_implementation='flash_attention_2' if has_fa2 else 'sdpa',
+            )
+            # Decoding only needs the last position's logits
+            model.generation_config.num_logits_to_keep = 1
+            model.forward = torch.compile(model.forward, mode="reduce-overhead")
+            Phi4MultimodalRAG._local_model = model
+        
+        processor = Phi4MultimodalRAG._local_processor
+        model = Phi4MultimodalRAG._local_model
         
         # Prepare prompt with placeholders
         user_content = ""
@@ -269,7 +425,7 @@ class Phi4MultimodalRAG:
         # Add audio if provided
         if audio_path:
             user_content += "<|audio_1|>"
-            audio_data, sample_rate = sf.read(audio_path)
+            audio_data, sample_rate = load_audio(audio_path)
             audios = [(audio_data, sample_rate)]
         
         # Add context and question
@@ -281,29 +437,45 @@ class Phi4MultimodalRAG:
             {"role": "user", "content": user_content}
         ]
         
-        prompt = processor.tokenizer.apply_chat_template(
-            messages,
-            tokenize=False,
-            add_generation_prompt=True
-        )
-        
-        # Prepare inputs
-        inputs_dict = {"text": prompt, "return_tensors": "pt"}
-        if images:
-            inputs_dict["images"] = images
-        if audios:
-            inputs_dict["audios"] = audios
-        
-        inputs = processor(**inputs_dict).to("cuda")
+        if images or audios:
+            # Media placeholders are expanded by the processor, so it needs
+            # the rendered prompt text
+            prompt = processor.tokenizer.apply_chat_template(
+                messages,
+                tokenize=False,
+                add_generation_prompt=True
+            )
+            
+            # Prepare inputs
+            inputs_dict = {"text": prompt, "return_tensors": "pt"}
+            if images:
+                inputs_dict["images"] = images
+            if audios:
+                inputs_dict["audios"] = audios
+            
+            inputs = processor(**inputs_dict).to("cuda")
+        else:
+            # Text-only: render and tokenize the template in a single pass
+            inputs = processor.tokenizer.apply_chat_template(
+                messages,
+                tokenize=True,
+                add_generation_prompt=True,
+                return_tensors="pt",
+                return_dict=True,
+                truncation=True,
+                max_length=2048
+            ).to("cuda")
         
         # Generate response
-        generate_ids = model.generate(
-            **inputs,
-            max_new_tokens=1000,
-            temperature=0.7,
-            do_sample=True,
-            eos_token_id=processor.tokenizer.eos_token_id,
-        )
+        with torch.inference_mode():
+            generate_ids = model.generate(
+                **inputs,
+                max_new_tokens=1000,
+                temperature=0.7,
+                do_sample=True,
+                num_logits_to_keep=1,
+                eos_token_id=processor.tokenizer.eos_token_id,
+            )
         
         # Decode response
         generate_ids = generate_ids[:, inputs['input_ids'].shape[1]:]
@@ -316,19 +488,30 @@ class Phi4MultimodalRAG:
         return response
 
 
+# Singleton instance
+_rag_system = None
+
+def get_rag_system() -> Phi4MultimodalRAG:
+    """Get or create the RAG system configured from environment variables"""
+    global _rag_system
+    if _rag_system is None:
+        _rag_system = Phi4MultimodalRAG(
+            inference_endpoint=os.environ.get("AZURE_INFERENCE_ENDPOINT"),
+            inference_key=os.environ.get("AZURE_INFERENCE_CREDENTIAL"),
+            search_endpoint=os.environ.get("AZURE_SEARCH_ENDPOINT"),
+            search_index=os.environ.get("AZURE_SEARCH_INDEX"),
+            search_key=os.environ.get("AZURE_SEARCH_KEY")
+        )
+    return _rag_system
+
+
 # Example usage
 def main():
     """
     Example of using the Phi4MultimodalRAG class.
     """
-    # Initialize RAG system (replace with your actual endpoints and keys)
-    rag = Phi4MultimodalRAG(
-        inference_endpoint=os.environ.get("AZURE_INFERENCE_ENDPOINT"),
-        inference_key=os.environ.get("AZURE_INFERENCE_CREDENTIAL"),
-        search_endpoint=os.environ.get("AZURE_SEARCH_ENDPOINT"),
-        search_index=os.environ.get("AZURE_SEARCH_INDEX"),
-        search_key=os.environ.get("AZURE_SEARCH_KEY")
-    )
+    # Initialize RAG system (set the AZURE_* environment variables first)
+    rag = get_rag_system()
     
     # Example 1: Text-only RAG
     print("=== Text-only RAG ===")
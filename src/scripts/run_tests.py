@@ -6,25 +6,57 @@ Comprehensive test runner for Music Analyzer V2
 """
 import argparse
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 from pathlib import Path
 
 # Ensure we're using the right venv
 VENV_PATH = "/home/davegornshtein/parakeet-env"
-if not sys.prefix == VENV_PATH:
+VENV_PYTHON = os.path.join(VENV_PATH, "bin", "python")
+# Set before re-exec'ing, so an interpreter whose sys.prefix never matches
+# VENV_PATH (not a venv, or reached through another path) can't loop
+REEXEC_ENV = "RUN_TESTS_REEXEC"
+if (os.path.realpath(sys.prefix) != os.path.realpath(VENV_PATH)
+        and os.path.exists(VENV_PYTHON) and not os.environ.get(REEXEC_ENV)):
+    # Re-exec under the venv interpreter instead of sourcing bin/activate
     print(f"Activating virtual environment: {VENV_PATH}")
-    activate_script = os.path.join(VENV_PATH, "bin", "activate")
-    exec(open(activate_script).read(), {'__file__': activate_script})
+    os.environ[REEXEC_ENV] = "1"
+    os.execv(VENV_PYTHON, [VENV_PYTHON, os.path.abspath(__file__), *sys.argv[1:]])
 
-def run_command(cmd, cwd=None):
-    """Run a command and return success status"""
+# Number of trailing output lines kept per failed command for the summary
+FAILURE_TAIL_LINES = 200
+
+# Last output lines of failed commands, keyed by command label
+failure_output = {}
+
+def run_command(cmd, cwd=None, label=None):
+    """Run a command, streaming its output line by line, and return success status"""
+    label = label or (cmd[0] if isinstance(cmd, list) else cmd.split()[0])
     print(f"\n{'='*60}")
     print(f"Running: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
     print(f"{'='*60}")
     
-    result = subprocess.run(cmd, shell=isinstance(cmd, str), cwd=cwd)
-    return result.returncode == 0
+    # Commands may run concurrently (see run_all_tests), so read through a
+    # pipe and prefix each line instead of letting them share the tty
+    tail = deque(maxlen=FAILURE_TAIL_LINES)
+    with subprocess.Popen(
+        cmd,
+        shell=isinstance(cmd, str),
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+        text=True,
+    ) as proc:
+        for line in proc.stdout:
+            tail.append(line)
+            print(f"[{label}] {line}", end="", flush=True)
+    
+    if proc.returncode != 0:
+        failure_output[label] = "".join(tail)
+    return proc.returncode == 0
 
 def run_python_tests(test_type=None, verbose=False, coverage=False):
     """Run Python tests"""
@@ -54,7 +86,7 @@ def run_python_tests(test_type=None, verbose=False, coverage=False):
     else:
         cmd.append("tests/")
     
-    return run_command(cmd)
+    return run_command(cmd, label=f"python_{test_type or 'all'}")
 
 def run_ui_tests(coverage=False):
     """Run UI tests"""
@@ -67,7 +99,7 @@ def run_ui_tests(coverage=False):
     # Check if node_modules exists
     if not (frontend_dir / "node_modules").exists():
         print("Installing frontend dependencies...")
-        if not run_command("npm install", cwd=frontend_dir):
+        if not run_command("npm install", cwd=frontend_dir, label="ui"):
             return False
     
     # Run tests
@@ -75,7 +107,7 @@ def run_ui_tests(coverage=False):
     if coverage:
         cmd += " --coverage"
     
-    return run_command(cmd, cwd=frontend_dir)
+    return run_command(cmd, cwd=frontend_dir, label="ui")
 
 def run_all_tests(verbose=False, coverage=False):
     """Run all tests"""
@@ -83,11 +115,27 @@ def run_all_tests(verbose=False, coverage=False):
     
     # Python tests
     print("\n🐍 Running Python tests...")
-    test_types = ["unit", "component", "system", "model"]
+    test_types = ["unit", "component", "system"]
     
-    for test_type in test_types:
-        print(f"\n📦 Running {test_type} tests...")
-        results[f"python_{test_type}"] = run_python_tests(test_type, verbose, coverage)
+    if coverage:
+        # Parallel pytest runs would clobber the shared .coverage data file
+        for test_type in test_types:
+            print(f"\n📦 Running {test_type} tests...")
+            results[f"python_{test_type}"] = run_python_tests(test_type, verbose, coverage)
+    else:
+        # CPU categories are independent; run their pytest processes concurrently
+        print(f"\n📦 Running {', '.join(test_types)} tests in parallel...")
+        with ThreadPoolExecutor(max_workers=len(test_types)) as executor:
+            futures = {
+                test_type: executor.submit(run_python_tests, test_type, verbose, coverage)
+                for test_type in test_types
+            }
+            for test_type, future in futures.items():
+                results[f"python_{test_type}"] = future.result()
+    
+    # Model tests need the GPU and memory to themselves, so they run last, alone
+    print("\n📦 Running model tests...")
+    results["python_model"] = run_python_tests("model", verbose, coverage)
     
     # UI tests
     print("\n🎨 Running UI tests...")
@@ -107,6 +155,12 @@ def run_all_tests(verbose=False, coverage=False):
     
     print(f"\nTotal: {passed}/{total} passed")
     
+    for test_name, output in failure_output.items():
+        print(f"\n{'='*60}")
+        print(f"Last {FAILURE_TAIL_LINES} lines of {test_name}")
+        print(f"{'='*60}")
+        print(output, end="")
+    
     return passed == total
 
 def main():
@@ -127,7 +181,7 @@ def main():
     # Set environment variables
     os.environ["USE_TF"] = "0"
     os.environ["USE_TORCH"] = "1"
-    os.environ["PYTORCH_CUDA_ALLOC_CONF"] = "max_split_size_mb:512"
+    os.environ["PYTORCH_CUDA_ALLOC_CONF"] = "max_split_size_mb:512,expandable_segments:True"
     
     if args.no_timeout:
         os.environ["PYTEST_TIMEOUT"] = "0"
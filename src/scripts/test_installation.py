@@ -16,9 +16,10 @@ if torch.cuda.is_available():
     
     # Test CUDA operations
     print("\nTesting CUDA operations...")
-    x = torch.rand(1000, 1000).cuda()
-    y = torch.rand(1000, 1000).cuda()
-    z = torch.matmul(x, y)
+    # Small operands exercise cuBLAS without paying for large-kernel autotuning
+    y = torch.rand(128, 128, device="cuda")
+    z = torch.matmul(y, y)
+    z.sum().item()
     print(f"CUDA matrix multiplication successful: {z.shape}")
 
 try:
@@ -21,16 +21,30 @@ processor = AutoProcessor.from_pretrained(model_path, trust_remote_code=True)
 print(processor.tokenizer)
 
 print("\nLoading model...")
-model = AutoModelForCausalLM.from_pretrained(
-    model_path,
-    trust_remote_code=True,
-    torch_dtype='auto',
-    _attn_implementation='eager',  # Using eager instead of flash_attention_2
-).cuda()
+# FlashAttention-2 (bf16) by default; set PHI4_ATTN=eager to reproduce the
+# num_logits_to_keep bug with eager attention
+attn_implementation = os.getenv('PHI4_ATTN', 'flash_attention_2')
+try:
+    model = AutoModelForCausalLM.from_pretrained(
+        model_path,
+        trust_remote_code=True,
+        attn_implementation=attn_implementation,
+        **kwargs,
+    ).cuda()
+except (ImportError, ValueError) as e:
+    # flash-attn not installed or unsupported on this GPU
+    print(f"⚠️  {attn_implementation} unavailable ({e}), falling back to eager")
+    model = AutoModelForCausalLM.from_pretrained(
+        model_path,
+        trust_remote_code=True,
+        attn_implementation='eager',
+        **kwargs,
+    ).cuda()
 print("model.config._attn_implementation:", model.config._attn_implementation)
 
 print("\nLoading generation config...")
 generation_config = GenerationConfig.from_pretrained(model_path, 'generation_config.json')
+generation_config.use_cache = True
 
 user_prompt = '<|user|>'
 assistant_prompt = '<|assistant|>'
@@ -4,14 +4,75 @@
 Test tar.gz export functionality
 """
 import asyncio
+import os
 import tarfile
 import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from src.utils.music_analyzer_export import get_exporter
 from src.models.music_analyzer_models import DatabaseManager, MusicFile
 from src.config.music_analyzer_config import DATABASE_URL
 from sqlalchemy import select
 
+# Read buffer for the streamed archive, matching the exporter's write buffer
+STREAM_BUFSIZE = 2 * 1024 * 1024
+
+# In-memory size of the spooled export before it moves to disk, as in the API
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Member names kept per archive and per top-level directory for display
+SHOWN_NAMES = 5
+
+def _summarize_tar(fileobj):
+    """Summarize a tar.gz read sequentially from fileobj in a single pass
+    
+    Only the member count and the first few names overall and per top-level
+    directory are kept, not the full member list.
+    """
+    summary = {'count': 0, 'names': [], 'dir_counts': Counter(), 'dir_names': {}}
+    # Stock tarfile must still read the archive the exporter wrote
+    with tarfile.open(fileobj=fileobj, mode='r|gz', bufsize=STREAM_BUFSIZE) as tar:
+        for member in tar:
+            summary['count'] += 1
+            if len(summary['names']) < SHOWN_NAMES:
+                summary['names'].append(member.name)
+            
+            dir_name, sep, _ = member.name.partition('/')
+            if sep:
+                summary['dir_counts'][dir_name] += 1
+                dir_names = summary['dir_names'].setdefault(dir_name, [])
+                if len(dir_names) < SHOWN_NAMES:
+                    dir_names.append(member.name)
+    return summary
+
+def _summarize_tar_stream(read_fd):
+    """Summarize a tar.gz read from a pipe"""
+    with os.fdopen(read_fd, 'rb') as stream:
+        try:
+            return _summarize_tar(stream)
+        finally:
+            # Drain so the exporter never blocks on a full pipe
+            while stream.read(STREAM_BUFSIZE):
+                pass
+
+def _print_names(summary):
+    """Print an archive summary's member count and first names"""
+    print(f"  Files in archive: {summary['count']} files")
+    for name in summary['names']:
+        print(f"    - {name}")
+    if summary['count'] > len(summary['names']):
+        print(f"    ... and {summary['count'] - len(summary['names'])} more")
+
+async def _export_and_summarize(export, *args):
+    """Stream an export through a pipe, summarizing the archive while it is produced"""
+    read_fd, write_fd = os.pipe()
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        summary = reader.submit(_summarize_tar_stream, read_fd)
+        with os.fdopen(write_fd, 'wb') as sink:
+            result = await export(*args, fileobj=sink)
+        return result, summary.result()
+
 async def test_tar_exports():
     """Test tar.gz export formats"""
     print("\n=== Testing TAR.GZ Export Functionality ===\n")
@@ -22,14 +83,19 @@ async def test_tar_exports():
     
     exporter = get_exporter()
     
-    # Get a sample music file
+    # Get the sample file and the batch files in one query
     async for db in db_manager.get_session():
-        result = await db.execute(select(MusicFile).limit(1))
-        music_file = result.scalar_one_or_none()
-        
-        if not music_file:
-            print("No music files found in database")
-            return
+        result = await db.execute(select(MusicFile).limit(3))
+        files = result.scalars().all()
+    
+    if not files:
+        print("No music files found in database")
+        return
+    
+    music_file = files[0]
+    file_ids = [str(f.id) for f in files]
+    if len(file_ids) < 2:
+        file_ids = [str(music_file.id)] * 3
     
     print(f"Testing with file: {music_file.original_filename}")
     print(f"Storage path: {music_file.storage_path}")
@@ -37,18 +103,21 @@ async def test_tar_exports():
     # Test 1: Single file tar.gz export (original files)
     print("\n1. Testing single file tar.gz export (original)...")
     try:
-        tar_export = await exporter.export_music_file(str(music_file.id), 'tar.gz')
+        tar_export, summary = await _export_and_summarize(
+            exporter.export_music_file, str(music_file.id), 'tar.gz'
+        )
         print(f"✓ TAR.GZ export successful")
         print(f"  Filename: {tar_export['filename']}")
-        print(f"  Size: {len(tar_export['content'])} bytes")
+        _print_names(summary)
         
-        # Verify tar content
-        with tempfile.NamedTemporaryFile(suffix='.tar.gz') as tmp:
-            tmp.write(tar_export['content'])
-            tmp.flush()
-            
-            with tarfile.open(tmp.name, 'r:gz') as tar:
-                print(f"  Files in archive: {tar.getnames()}")
+        # The API streams archives into a spooled temp file and sends it back
+        # from the start; check that path too
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+            await exporter.export_music_file(str(music_file.id), 'tar.gz', fileobj=spool)
+            spooled_size = spool.tell()
+            spool.seek(0)
+            spooled_summary = _summarize_tar(spool)
+        print(f"  Spooled export: {spooled_size} bytes, {spooled_summary['count']} files")
                 
     except Exception as e:
         print(f"✗ TAR.GZ export failed: {e}")
@@ -56,18 +125,12 @@ async def test_tar_exports():
     # Test 2: Single file mono tar.gz export
     print("\n2. Testing single file mono tar.gz export...")
     try:
-        mono_export = await exporter.export_music_file(str(music_file.id), 'mono_tar.gz')
+        mono_export, summary = await _export_and_summarize(
+            exporter.export_music_file, str(music_file.id), 'mono_tar.gz'
+        )
         print(f"✓ Mono TAR.GZ export successful")
         print(f"  Filename: {mono_export['filename']}")
-        print(f"  Size: {len(mono_export['content'])} bytes")
-        
-        # Verify tar content
-        with tempfile.NamedTemporaryFile(suffix='.tar.gz') as tmp:
-            tmp.write(mono_export['content'])
-            tmp.flush()
-            
-            with tarfile.open(tmp.name, 'r:gz') as tar:
-                print(f"  Files in archive: {tar.getnames()}")
+        _print_names(summary)
                 
     except Exception as e:
         print(f"✗ Mono TAR.GZ export failed: {e}")
@@ -75,67 +138,33 @@ async def test_tar_exports():
     # Test 3: Batch tar.gz export
     print("\n3. Testing batch tar.gz export...")
     try:
-        # Get multiple files
-        async for db in db_manager.get_session():
-            result = await db.execute(select(MusicFile).limit(3))
-            files = result.scalars().all()
-            file_ids = [str(f.id) for f in files]
-        
-        if len(file_ids) < 2:
-            file_ids = [str(music_file.id)] * 3
-        
-        batch_tar_export = await exporter.export_batch(file_ids, 'tar.gz')
+        batch_tar_export, summary = await _export_and_summarize(exporter.export_batch, file_ids, 'tar.gz')
         print(f"✓ Batch TAR.GZ export successful")
         print(f"  Filename: {batch_tar_export['filename']}")
-        print(f"  Size: {len(batch_tar_export['content'])} bytes")
         print(f"  Number of files: {len(file_ids)}")
         
-        # Verify tar content
-        with tempfile.NamedTemporaryFile(suffix='.tar.gz') as tmp:
-            tmp.write(batch_tar_export['content'])
-            tmp.flush()
+        _print_names(summary)
             
-            with tarfile.open(tmp.name, 'r:gz') as tar:
-                members = tar.getnames()
-                print(f"  Files in archive: {len(members)} files")
-                for member in members[:5]:  # Show first 5
-                    print(f"    - {member}")
-                if len(members) > 5:
-                    print(f"    ... and {len(members) - 5} more")
-                    
     except Exception as e:
         print(f"✗ Batch TAR.GZ export failed: {e}")
     
     # Test 4: Batch mono tar.gz export
     print("\n4. Testing batch mono tar.gz export...")
     try:
-        batch_mono_export = await exporter.export_batch(file_ids, 'mono_tar.gz')
+        batch_mono_export, summary = await _export_and_summarize(exporter.export_batch, file_ids, 'mono_tar.gz')
         print(f"✓ Batch Mono TAR.GZ export successful")
         print(f"  Filename: {batch_mono_export['filename']}")
-        print(f"  Size: {len(batch_mono_export['content'])} bytes")
         
-        # Verify tar content
-        with tempfile.NamedTemporaryFile(suffix='.tar.gz') as tmp:
-            tmp.write(batch_mono_export['content'])
-            tmp.flush()
-            
-            with tarfile.open(tmp.name, 'r:gz') as tar:
-                members = tar.getnames()
-                print(f"  Files in archive: {len(members)} files")
-                
-                # Group by directory
-                dirs = set()
-                for member in members:
-                    if '/' in member:
-                        dirs.add(member.split('/')[0])
+        print(f"  Files in archive: {summary['count']} files")
+        
+        # Directories were grouped while streaming
+        dir_counts = summary['dir_counts']
+        print(f"  Directories: {len(dir_counts)}")
+        for dir_name in list(dir_counts)[:3]:  # Show first 3 directories
+            print(f"    - {dir_name}/: {dir_counts[dir_name]} files")
+            for f in summary['dir_names'][dir_name][:3]:  # Show first 3 files in each dir
+                print(f"      - {f}")
                 
-                print(f"  Directories: {len(dirs)}")
-                for dir_name in list(dirs)[:3]:  # Show first 3 directories
-                    dir_files = [m for m in members if m.startswith(f"{dir_name}/")]
-                    print(f"    - {dir_name}/: {len(dir_files)} files")
-                    for f in dir_files[:3]:  # Show first 3 files in each dir
-                        print(f"      - {f}")
-                        
     except Exception as e:
         print(f"✗ Batch Mono TAR.GZ export failed: {e}")
     
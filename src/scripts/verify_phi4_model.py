@@ -6,11 +6,22 @@ Verify phi-4-multimodal model integrity
 import torch
 from transformers import AutoModelForCausalLM, AutoProcessor
 import hashlib
+import mmap
 import os
 
 model_path = "microsoft/Phi-4-multimodal-instruct"
 cache_dir = "/home/davegornshtein/parakeet-tdt-deployment/models/phi-4-multimodal"
 
+def sha256_file(path):
+    """SHA-256 of a file, hashed from a read-only mapping without a Python read loop"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()  # empty files cannot be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # One update over the whole mapping; hashlib releases the GIL and
+            # OpenSSL can use the CPU's SHA extensions
+            return hashlib.sha256(mm).hexdigest()
+
 print("1. Checking model files...")
 model_files = [
     "models--microsoft--Phi-4-multimodal-instruct/blobs/c46bb03332d82f6a3eaf85bd20af388dd4d4d68b198c2203c965c7381a466094",
@@ -23,7 +34,12 @@ for f in model_files:
     path = os.path.join(cache_dir, f)
     if os.path.exists(path):
         size = os.path.getsize(path)
-        print(f"  ✓ {os.path.basename(f)}: {size / 1024**3:.2f} GB")
+        # Hub LFS blobs are named after the SHA-256 of their content
+        expected = os.path.basename(f)
+        if sha256_file(path) == expected:
+            print(f"  ✓ {expected}: {size / 1024**3:.2f} GB, checksum OK")
+        else:
+            print(f"  ✗ {expected}: {size / 1024**3:.2f} GB, CHECKSUM MISMATCH")
         total_size += size
     else:
         print(f"  ✗ {os.path.basename(f)}: MISSING")
@@ -60,18 +76,25 @@ except Exception as e:
 print("\n4. Checking for known issues...")
 # Check modeling file for num_logits_to_keep issue
 modeling_file = os.path.join(cache_dir, "models--microsoft--Phi-4-multimodal-instruct/blobs/31fe013b98d269c5962e17968bc376992704036f")
-if os.path.exists(modeling_file):
-    with open(modeling_file, 'r') as f:
-        content = f.read()
-        if "num_logits_to_keep: int = 0" in content:
+if os.path.exists(modeling_file) and os.path.getsize(modeling_file) > 0:
+    # Search the mapped bytes directly instead of decoding the whole file
+    with open(modeling_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm.find(b"num_logits_to_keep: int = 0") != -1:
             print("  ⚠️  Found num_logits_to_keep parameter with default=0")
-        if "-num_logits_to_keep:" in content:
+        if mm.find(b"-num_logits_to_keep:") != -1:
             print("  ⚠️  Found problematic -num_logits_to_keep usage")
-            # Find the specific line
-            lines = content.split('\n')
-            for i, line in enumerate(lines):
-                if "hidden_states[:, -num_logits_to_keep:, :]" in line:
-                    print(f"    Line {i+1}: {line.strip()}")
+            # Find the specific lines, counting newlines only up to each match
+            needle = b"hidden_states[:, -num_logits_to_keep:, :]"
+            line_no, counted_to = 1, 0
+            pos = mm.find(needle)
+            while pos != -1:
+                line_no += mm[counted_to:pos].count(b"\n")
+                counted_to = pos
+                start = mm.rfind(b"\n", 0, pos) + 1
+                end = mm.find(b"\n", pos)
+                line = mm[start:end if end != -1 else len(mm)]
+                print(f"    Line {line_no}: {line.decode('utf-8', 'replace').strip()}")
+                pos = mm.find(needle, end if end != -1 else len(mm))
 
 print("\n5. Alternative model suggestions...")
 print("  Since phi-4-multimodal has generation issues, consider using:")
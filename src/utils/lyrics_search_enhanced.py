@@ -5,20 +5,135 @@ Enhanced Lyrics Search Manager with Gemma Intelligence
 import os
 import asyncio
 import aiohttp
+import copy
+import inspect
 import logging
-from typing import Optional, List, Dict, Any
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
 from urllib.parse import quote
 import json
 from datetime import datetime
 from dotenv import load_dotenv
 from src.models.gemma_manager import get_gemma_manager
 
+# orjson parses large (raw content) search responses several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Lyrics sites recognised in result URLs, matched in a single scan
+_SITE_RE = re.compile(r'(genius|azlyrics|musixmatch|lyrics)\.com')
+_SITE_NAME = {
+    'genius': 'Genius',
+    'azlyrics': 'AZLyrics',
+    'musixmatch': 'Musixmatch',
+    'lyrics': 'Lyrics.com'
+}
+_BRAVE_SITES = ('genius', 'azlyrics', 'musixmatch')
+
+# Pieces of the quality score (1-10) in a Gemma analysis: the "quality"
+# label, an "N/10" or "N out of 10" score, an echoed "1-10" scale to ignore,
+# a leading list number like "1." to ignore, and a standalone 1-10 integer
+# (not part of a decimal); followed by the phrases taken as confirming lyrics
+_QUALITY_RE = re.compile(r'(?i)quality')
+_QUALITY_OUT_OF_RE = re.compile(r'(?i)\b(10|[1-9])\s*(?:/|out of)\s*10\b')
+_QUALITY_SCALE_RE = re.compile(r'(?i)\(?\b1\s*(?:-|–|to)\s*10\b\)?')
+_LIST_MARKER_RE = re.compile(r'^\s*\d+[.)]\s')
+_QUALITY_SCORE_RE = re.compile(r'(?<![\d.])\b(10|[1-9])\b(?!\.?\d)')
+_ACTUAL_LYRICS_RE = re.compile(r'(?i)actual song lyrics')
+_YES_RE = re.compile(r'(?i)\byes\b')
+
+def _parse_quality_score(response: str) -> Optional[int]:
+    """
+    Read the 1-10 quality score from a Gemma analysis
+    
+    Looks at the line holding the first "quality" label (or the line after
+    it when that one has no score). An "N/10" score wins, then the first
+    integer after a colon, then the last standalone integer on the line;
+    echoed "1-10" scales are ignored.
+    
+    Args:
+        response: Gemma analysis text
+    
+    Returns:
+        The score, or None when no score is found
+    """
+    label = _QUALITY_RE.search(response)
+    if label is None:
+        return None
+    for line in response[label.end():].split('\n', 2)[:2]:
+        out_of = _QUALITY_OUT_OF_RE.search(line)
+        if out_of:
+            return int(out_of.group(1))
+        line = _QUALITY_SCALE_RE.sub(' ', _LIST_MARKER_RE.sub(' ', line))
+        _, colon, after_colon = line.partition(':')
+        if colon:
+            score = _QUALITY_SCORE_RE.search(after_colon)
+            if score:
+                return int(score.group(1))
+        scores = _QUALITY_SCORE_RE.findall(line)
+        if scores:
+            return int(scores[-1])
+    return None
+
+def _configure_cpu_threads(torch):
+    """Size torch's CPU thread pools to the physical cores for Gemma on CPU"""
+    # Hyperthreads and cross-socket workers slow memory-bound inference
+    # (OMP_NUM_THREADS would be read too late: torch is already imported)
+    physical_cores = max((os.cpu_count() or 2) // 2, 1)
+    torch.set_num_threads(physical_cores)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # interop pool already started; keep its size
+
+def _cpu_supports_bf16() -> bool:
+    """Whether the CPU has native BF16 math (AVX512-BF16 or AMX)"""
+    try:
+        with open('/proc/cpuinfo') as f:
+            cpuinfo = f.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in cpuinfo or 'amx_bf16' in cpuinfo
+
+def _accepts_kwarg(func, name: str) -> bool:
+    """Whether func can be called with the keyword argument name"""
+    try:
+        params = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == name or p.kind is inspect.Parameter.VAR_KEYWORD for p in params)
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a JSON response body, straight from bytes"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize a JSON request body"""
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode('utf-8')
+
 class EnhancedLyricsSearchManager:
+    # Maximum number of (artist, title) search results kept, and for how long
+    # in seconds they are reused
+    SEARCH_CACHE_SIZE = 1024
+    SEARCH_CACHE_TTL = 24 * 60 * 60
+    # A Brave hit at least this confident (one naming both artist and title)
+    # skips Tavily
+    BRAVE_SKIP_TAVILY_CONFIDENCE = 0.9
+    
+    # Invariant parts of the search requests
+    _BRAVE_QUERY_SUFFIX = " lyrics site:genius.com OR site:azlyrics.com OR site:musixmatch.com"
+    _TAVILY_DOMAINS = ("genius.com", "azlyrics.com", "musixmatch.com", "lyrics.com")
+    
     def __init__(self):
         """Initialize enhanced lyrics search manager with Gemma integration"""
         self.brave_api_key = os.getenv('BRAVE_SEARCH_API_KEY')
@@ -38,15 +153,82 @@ class EnhancedLyricsSearchManager:
             "Content-Type": "application/json"
         }
         
+        # Tavily request fields shared by every search
+        self._tavily_base_payload = {
+            "api_key": self.tavily_api_key,
+            "include_answer": True,
+            "max_results": 5,
+            "include_domains": self._TAVILY_DOMAINS
+        }
+        
         # Initialize Gemma manager
         self.gemma_manager = get_gemma_manager()
         self.gemma_loaded = False
+        self._gemma_init_task: Optional[asyncio.Task] = None
+        
+        # Shared HTTP session, created on first search so it binds to the
+        # running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # LRU of (timestamp, results) per normalized (artist, title) and search
+        # mode, plus searches in progress so concurrent duplicates share one
+        # lookup; cheap (Brave-first) results never stand in for full ones
+        self._search_cache: "OrderedDict[Tuple[str, str, bool], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, bool], asyncio.Task] = {}
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, keeping connections and TLS sessions warm"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=15, connect=3)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def prewarm(self):
+        """Open the HTTP session and load Gemma ahead of the first search"""
+        await self._get_session()
+        await self.initialize_gemma()
     
     async def initialize_gemma(self):
         """Initialize Gemma model if not already loaded"""
+        if self.gemma_loaded:
+            return
+        # Concurrent callers share one load; a failed load is retried next time
+        if self._gemma_init_task is None or self._gemma_init_task.done():
+            self._gemma_init_task = asyncio.ensure_future(self._load_gemma())
+        await asyncio.shield(self._gemma_init_task)
+    
+    async def _load_gemma(self):
+        """Load the Gemma model with CPU inference hints"""
         if not self.gemma_loaded:
             try:
-                await asyncio.to_thread(self.gemma_manager.load_model)
+                import torch
+                cpu_only = not torch.cuda.is_available()
+                if cpu_only:
+                    _configure_cpu_threads(torch)
+                
+                # BF16 halves weight bandwidth; on CPU only with native BF16 math
+                dtype = torch.bfloat16 if not cpu_only or _cpu_supports_bf16() else None
+                
+                if dtype is not None and _accepts_kwarg(self.gemma_manager.load_model, 'torch_dtype'):
+                    # Load straight into BF16 instead of casting full-precision weights
+                    await asyncio.to_thread(self.gemma_manager.load_model, torch_dtype=dtype)
+                else:
+                    await asyncio.to_thread(self.gemma_manager.load_model)
+                    # Loaders without a dtype option get their FP32 weights cast
+                    model = getattr(self.gemma_manager, 'model', None)
+                    if (dtype is not None and model is not None
+                            and getattr(model, 'dtype', None) == torch.float32):
+                        await asyncio.to_thread(model.to, dtype)
+                        logger.info("Gemma weights cast to bfloat16")
+                
                 self.gemma_loaded = True
                 logger.info("Gemma model initialized for lyrics search")
             except Exception as e:
@@ -54,7 +236,8 @@ class EnhancedLyricsSearchManager:
                 self.gemma_loaded = False
     
     async def search_lyrics_intelligent(self, artist: str, title: str, 
-                                      transcribed_text: Optional[str] = None) -> Dict[str, Any]:
+                                      transcribed_text: Optional[str] = None,
+                                      cheap_mode: bool = False) -> Dict[str, Any]:
         """
         Intelligently search for lyrics using Gemma to decide search strategy
         
@@ -62,10 +245,71 @@ class EnhancedLyricsSearchManager:
             artist: Artist name
             title: Song title
             transcribed_text: Optional transcribed text for comparison
+            cheap_mode: Query Brave first and Tavily only when Gemma asks for
+                it, saving Tavily calls at the cost of latency
         
         Returns:
             Search results with Gemma analysis
         """
+        key = (artist.lower().strip(), title.lower().strip(), cheap_mode)
+        cached = self._search_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.SEARCH_CACHE_TTL:
+            self._search_cache.move_to_end(key)
+            results = copy.deepcopy(cached[1])
+        else:
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._search_uncached(artist, title, cheap_mode))
+                self._inflight[key] = task
+                task.add_done_callback(lambda done: self._finish_search(key, done))
+            results = copy.deepcopy(await asyncio.shield(task))
+        
+        # Step 4: If we have transcribed text, compare with found lyrics
+        if transcribed_text and results.get("best_source"):
+            await self._upgrade_tavily_result(key, results)
+            best_result = results["results"].get(results["best_source"])
+            if best_result and self.gemma_loaded:
+                comparison = await self.gemma_manager.compare_transcriptions(
+                    transcribed_text,
+                    best_result.get("full_content", best_result.get("snippet", ""))
+                )
+                results["analysis"]["transcription_comparison"] = comparison
+        
+        return results
+    
+    async def _upgrade_tavily_result(self, key: Tuple[str, str, bool], results: Dict[str, Any]):
+        """Refetch a good basic Tavily winner with full page content for comparison"""
+        tavily_result = results["results"].get("tavily")
+        if (results["best_source"] != "tavily" or not tavily_result
+                or tavily_result.get("has_raw_content", True)
+                or results["analysis"].get("tavily_quality", {}).get("score", 0) < 7):
+            return
+        
+        full_result = await self.search_tavily(results["artist"], results["title"])
+        if not full_result:
+            return
+        results["results"]["tavily"] = full_result
+        
+        # Later comparisons for this song reuse the full result
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            cached[1]["results"]["tavily"] = copy.deepcopy(full_result)
+    
+    def _finish_search(self, key: Tuple[str, str, bool], task: asyncio.Task):
+        """Drop a search's in-flight entry and cache its result"""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        # Search errors surface as missing results; don't pin those for a day
+        if not task.result().get("best_source"):
+            return
+        self._search_cache[key] = (time.monotonic(), task.result())
+        self._search_cache.move_to_end(key)
+        while len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+    
+    async def _search_uncached(self, artist: str, title: str, cheap_mode: bool) -> Dict[str, Any]:
+        """Run the search strategy without consulting the cache"""
         results = {
             "artist": artist,
             "title": title,
@@ -78,15 +322,66 @@ class EnhancedLyricsSearchManager:
         # Ensure Gemma is initialized
         await self.initialize_gemma()
         
-        # Step 1: Search with Brave API first
         logger.info(f"Starting intelligent search for: {artist} - {title}")
+        if cheap_mode:
+            await self._search_sequential(artist, title, results)
+        else:
+            await self._search_parallel(artist, title, results)
+        
+        return results
+    
+    async def _search_parallel(self, artist: str, title: str, results: Dict[str, Any]):
+        """Query Brave and Tavily concurrently, then let Gemma rank both"""
+        brave_result, tavily_result = await asyncio.gather(
+            self.search_brave(artist, title),
+            self.search_tavily(artist, title, depth="basic", raw=False),
+            return_exceptions=True
+        )
+        found = {}
+        for source, result in (("brave", brave_result), ("tavily", tavily_result)):
+            if isinstance(result, Exception):
+                logger.error(f"{source} search error: {result}")
+            elif result:
+                found[source] = result
+        results["results"].update(found)
+        
+        if not found:
+            return
+        if len(found) == 1:
+            results["best_source"] = next(iter(found))
+            if self.gemma_loaded:
+                source, result = next(iter(found.items()))
+                results["analysis"][f"{source}_quality"] = await self._analyze_search_quality(
+                    result, artist, title, source
+                )
+            return
+        
+        if not self.gemma_loaded:
+            logger.warning("Gemma not available, using simple source selection")
+            results["best_source"] = self._select_best_source_simple(results["results"])
+            return
+        
+        brave_quality, tavily_quality, best_source = await self._analyze_and_select(
+            found["brave"], found["tavily"], artist, title
+        )
+        results["analysis"]["brave_quality"] = brave_quality
+        results["analysis"]["tavily_quality"] = tavily_quality
+        results["best_source"] = best_source
+    
+    async def _search_sequential(self, artist: str, title: str, results: Dict[str, Any]):
+        """Query Brave first and only fall back to Tavily when needed"""
+        # Step 1: Search with Brave API first
         brave_result = await self.search_brave(artist, title)
         
         if brave_result:
             results["results"]["brave"] = brave_result
             
+            if self._is_clear_brave_match(brave_result):
+                # Brave clearly matched, no need for Gemma to weigh a re-search
+                results["analysis"]["need_tavily"] = False
+                results["best_source"] = "brave"
             # Step 2: Use Gemma to analyze Brave results
-            if self.gemma_loaded:
+            elif self.gemma_loaded:
                 brave_quality = await self._analyze_search_quality(
                     brave_result, artist, title, "brave"
                 )
@@ -100,7 +395,7 @@ class EnhancedLyricsSearchManager:
                 
                 if need_tavily:
                     logger.info("Gemma suggests searching Tavily for better results")
-                    tavily_result = await self.search_tavily(artist, title)
+                    tavily_result = await self.search_tavily(artist, title, depth="basic", raw=False)
                     
                     if tavily_result:
                         results["results"]["tavily"] = tavily_result
@@ -123,29 +418,17 @@ class EnhancedLyricsSearchManager:
             else:
                 # Fallback: search both if Gemma not available
                 logger.warning("Gemma not available, searching both APIs")
-                tavily_result = await self.search_tavily(artist, title)
+                tavily_result = await self.search_tavily(artist, title, depth="basic", raw=False)
                 if tavily_result:
                     results["results"]["tavily"] = tavily_result
                 results["best_source"] = self._select_best_source_simple(results["results"])
         else:
             # Brave failed, try Tavily
             logger.info("Brave search failed, trying Tavily")
-            tavily_result = await self.search_tavily(artist, title)
+            tavily_result = await self.search_tavily(artist, title, depth="basic", raw=False)
             if tavily_result:
                 results["results"]["tavily"] = tavily_result
                 results["best_source"] = "tavily"
-        
-        # Step 4: If we have transcribed text, compare with found lyrics
-        if transcribed_text and results.get("best_source"):
-            best_result = results["results"].get(results["best_source"])
-            if best_result and self.gemma_loaded:
-                comparison = await self.gemma_manager.compare_transcriptions(
-                    transcribed_text,
-                    best_result.get("full_content", best_result.get("snippet", ""))
-                )
-                results["analysis"]["transcription_comparison"] = comparison
-        
-        return results
     
     async def _analyze_search_quality(self, search_result: Dict, 
                                     artist: str, title: str, source: str) -> Dict:
@@ -170,25 +453,74 @@ Analysis:"""
             response = await self.gemma_manager._generate(prompt)
             
             # Parse quality score from response
-            quality_score = 5  # default
-            for line in response.split('\n'):
-                if 'quality' in line.lower() and any(str(i) in line for i in range(1, 11)):
-                    for i in range(10, 0, -1):
-                        if str(i) in line:
-                            quality_score = i
-                            break
+            quality_score = _parse_quality_score(response)
+            if quality_score is None:
+                quality_score = 5
             
             return {
                 "score": quality_score,
                 "analysis": response,
-                "has_lyrics": "actual song lyrics" in response.lower() or "yes" in response.lower()[:50]
+                "has_lyrics": bool(_ACTUAL_LYRICS_RE.search(response) or _YES_RE.search(response, 0, 50))
             }
         except Exception as e:
             logger.error(f"Gemma analysis error: {e}")
             return {"score": 5, "analysis": "Error in analysis", "has_lyrics": True}
     
+    async def _analyze_and_select(self, brave_result: Dict, tavily_result: Dict,
+                                  artist: str, title: str) -> Tuple[Dict, Dict, str]:
+        """Score both search results and pick the best one in a single Gemma call"""
+        def preview(result: Dict) -> str:
+            content = result.get("full_content") or result.get("snippet") or result.get("lyrics", "")
+            return content[:300]
+        
+        prompt = f"""Compare two search results for the lyrics of the song "{title}" by {artist}.
+
+Brave result:
+URL: {brave_result.get("url", "")}
+Content preview: {preview(brave_result)}
+
+Tavily result:
+URL: {tavily_result.get("url", "")}
+Content preview: {preview(tavily_result)}
+
+Rate each result's quality (1-10): does it contain actual song lyrics, is it the
+correct song, and how complete are the lyrics? Reply with only this JSON:
+{{"brave_score": N, "tavily_score": N, "brave_has_lyrics": true|false, "tavily_has_lyrics": true|false, "winner": "brave"|"tavily"}}
+
+JSON:"""
+        
+        verdict = {}
+        response = ""
+        try:
+            response = await self.gemma_manager._generate(prompt)
+            match = re.search(r'\{.*?\}', response, re.DOTALL)
+            verdict = json.loads(match.group(0) if match else response)
+        except Exception as e:
+            logger.error(f"Gemma analysis error: {e}")
+        
+        qualities = {}
+        for source in ("brave", "tavily"):
+            try:
+                score = min(max(int(verdict.get(f"{source}_score", 5)), 1), 10)
+            except (TypeError, ValueError):
+                score = 5
+            qualities[source] = {
+                "score": score,
+                "analysis": response or "Error in analysis",
+                "has_lyrics": bool(verdict.get(f"{source}_has_lyrics", True))
+            }
+        
+        winner = str(verdict.get("winner", "")).lower()
+        if winner not in qualities:
+            # Fallback to scores
+            winner = "tavily" if qualities["tavily"]["score"] > qualities["brave"]["score"] else "brave"
+        return qualities["brave"], qualities["tavily"], winner
+    
     async def _should_search_tavily(self, brave_quality: Dict, brave_result: Dict) -> bool:
         """Decide if we should search Tavily based on Brave results"""
+        if self._is_clear_brave_match(brave_result):
+            return False
+        
         # If Brave score is low or doesn't have lyrics, search Tavily
         if brave_quality.get("score", 0) < 7 or not brave_quality.get("has_lyrics", False):
             return True
@@ -245,62 +577,70 @@ Answer:"""
             logger.warning("Brave API key not configured")
             return None
         
-        query = f"{artist} {title} lyrics site:genius.com OR site:azlyrics.com OR site:musixmatch.com"
-        
         params = {
-            "q": query,
+            "q": f"{artist} {title}{self._BRAVE_QUERY_SUFFIX}",
             "count": 10,
             "safesearch": "moderate"
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.brave_url,
-                    headers=self.brave_headers,
-                    params=params
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_brave_results(data, artist, title)
-                    else:
-                        logger.error(f"Brave API error: {response.status}")
-                        return None
+            session = await self._get_session()
+            async with session.get(
+                self.brave_url,
+                headers=self.brave_headers,
+                params=params
+            ) as response:
+                if response.status == 200:
+                    data = _json_loads(await response.read())
+                    return self._parse_brave_results(data, artist, title)
+                else:
+                    logger.error(f"Brave API error: {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"Brave search error: {e}")
             return None
     
-    async def search_tavily(self, artist: str, title: str) -> Optional[Dict]:
-        """Search for lyrics using Tavily API"""
+    async def search_tavily(self, artist: str, title: str, depth: str = "advanced",
+                            raw: bool = True) -> Optional[Dict]:
+        """
+        Search for lyrics using Tavily API
+        
+        Args:
+            artist: Artist name
+            title: Song title
+            depth: Tavily search depth, "basic" or "advanced"
+            raw: Include each page's raw content (much larger responses)
+        
+        Returns:
+            Best parsed result, or None
+        """
         if not self.tavily_api_key:
             logger.warning("Tavily API key not configured")
             return None
         
-        query = f"{artist} {title} lyrics"
-        
         payload = {
-            "api_key": self.tavily_api_key,
-            "query": query,
-            "search_depth": "advanced",
-            "include_answer": True,
-            "include_raw_content": True,
-            "max_results": 5,
-            "include_domains": ["genius.com", "azlyrics.com", "musixmatch.com", "lyrics.com"]
+            **self._tavily_base_payload,
+            "query": f"{artist} {title} lyrics",
+            "search_depth": depth,
+            "include_raw_content": raw
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.tavily_url,
-                    headers=self.tavily_headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_tavily_results(data, artist, title)
-                    else:
-                        logger.error(f"Tavily API error: {response.status}")
-                        return None
+            session = await self._get_session()
+            async with session.post(
+                self.tavily_url,
+                headers=self.tavily_headers,
+                data=_json_dumps(payload)
+            ) as response:
+                if response.status == 200:
+                    data = _json_loads(await response.read())
+                    result = self._parse_tavily_results(data, artist, title)
+                    if result:
+                        result["has_raw_content"] = raw
+                    return result
+                else:
+                    logger.error(f"Tavily API error: {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"Tavily search error: {e}")
             return None
@@ -308,24 +648,45 @@ Answer:"""
     def _parse_brave_results(self, data: Dict, artist: str, title: str) -> Optional[Dict]:
         """Parse Brave search results for lyrics"""
         results = data.get("web", {}).get("results", [])
+        artist_lower = artist.lower()
+        title_lower = title.lower()
+        
+        # Score every lyrics-site result rather than taking the first plausible one
+        best_result = None
+        best_score = 0.0
+        best_site = None
         
         for result in results:
             url = result.get("url", "")
             title_text = result.get("title", "").lower()
-            description = result.get("description", "")
             
-            if any(site in url for site in ["genius.com", "azlyrics.com", "musixmatch.com"]):
-                if artist.lower() in title_text or title.lower() in title_text:
-                    return {
-                        "source": "brave",
-                        "url": url,
-                        "title": result.get("title"),
-                        "snippet": description,
-                        "site": self._extract_site_name(url),
-                        "confidence": self._calculate_confidence(title_text, artist, title)
-                    }
+            site = _SITE_RE.search(url)
+            if not site or site.group(1) not in _BRAVE_SITES:
+                continue
+            if artist_lower not in title_text and title_lower not in title_text:
+                continue
+            
+            score = self._calculate_confidence(title_text, artist_lower, title_lower)
+            if score > best_score:
+                best_result = result
+                best_score = score
+                best_site = site
         
-        return None
+        if best_result is None:
+            return None
+        
+        return {
+            "source": "brave",
+            "url": best_result.get("url", ""),
+            "title": best_result.get("title"),
+            "snippet": best_result.get("description", ""),
+            "site": _SITE_NAME[best_site.group(1)],
+            "confidence": best_score
+        }
+    
+    def _is_clear_brave_match(self, brave_result: Dict) -> bool:
+        """Whether a parsed Brave result names both the artist and the title"""
+        return brave_result.get("confidence", 0) >= self.BRAVE_SKIP_TAVILY_CONFIDENCE
     
     def _parse_tavily_results(self, data: Dict, artist: str, title: str) -> Optional[Dict]:
         """Parse Tavily search results for lyrics"""
@@ -342,6 +703,8 @@ Answer:"""
         
         best_result = None
         highest_score = 0
+        artist_lower = artist.lower()
+        title_lower = title.lower()
         
         for result in results:
             url = result.get("url", "")
@@ -349,7 +712,7 @@ Answer:"""
             content = result.get("raw_content", "") or result.get("content", "")
             score = result.get("score", 0)
             
-            if artist.lower() in title_text and title.lower() in title_text:
+            if artist_lower in title_text and title_lower in title_text:
                 if score > highest_score:
                     highest_score = score
                     best_result = {
@@ -366,23 +729,11 @@ Answer:"""
     
     def _extract_site_name(self, url: str) -> str:
         """Extract site name from URL"""
-        if "genius.com" in url:
-            return "Genius"
-        elif "azlyrics.com" in url:
-            return "AZLyrics"
-        elif "musixmatch.com" in url:
-            return "Musixmatch"
-        elif "lyrics.com" in url:
-            return "Lyrics.com"
-        else:
-            return "Other"
+        match = _SITE_RE.search(url)
+        return _SITE_NAME[match.group(1)] if match else "Other"
     
-    def _calculate_confidence(self, text: str, artist: str, title: str) -> float:
-        """Calculate confidence score for search result"""
-        text_lower = text.lower()
-        artist_lower = artist.lower()
-        title_lower = title.lower()
-        
+    def _calculate_confidence(self, text_lower: str, artist_lower: str, title_lower: str) -> float:
+        """Calculate confidence score for search result (all inputs already lowercased)"""
         score = 0.5
         
         if artist_lower in text_lower:
@@ -394,10 +745,14 @@ Answer:"""
 
 # Singleton instance
 _enhanced_lyrics_manager = None
+_enhanced_lyrics_manager_lock = threading.Lock()
 
 def get_enhanced_lyrics_manager() -> EnhancedLyricsSearchManager:
     """Get or create enhanced lyrics search manager instance"""
     global _enhanced_lyrics_manager
     if _enhanced_lyrics_manager is None:
-        _enhanced_lyrics_manager = EnhancedLyricsSearchManager()
+        # Never build two managers (and load Gemma twice) from racing threads
+        with _enhanced_lyrics_manager_lock:
+            if _enhanced_lyrics_manager is None:
+                _enhanced_lyrics_manager = EnhancedLyricsSearchManager()
     return _enhanced_lyrics_manager
\ No newline at end of file
@@ -5,108 +5,644 @@ Provides export capabilities for music analysis results in various formats
 """
 import json
 import csv
+import gzip
+import importlib.util
 import io
+import itertools
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import threading
+import uuid
 import zipfile
 import tarfile
 import tempfile
-from typing import Dict, List, Any, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Any, Optional, Sequence, Set, Tuple
 from datetime import datetime
 import pandas as pd
+from functools import partial
+from operator import attrgetter, itemgetter
 from pathlib import Path
 import asyncio
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import inspect as sa_inspect, select
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+
+# orjson pretty-prints export JSON many times faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from src.models.music_analyzer_models import MusicFile, Transcription, Lyrics, SearchHistory, DatabaseManager
 from src.config.music_analyzer_config import MINIO_CONFIG, DATABASE_URL
 
+# xlsxwriter writes workbooks considerably faster than openpyxl; use it when
+# installed
+EXCEL_ENGINE = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') is not None else 'openpyxl'
+
+def _json_bytes(data: Any) -> bytes:
+    """Serialize export data as UTF-8 JSON indented by two spaces"""
+    if orjson is not None:
+        return orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(data, indent=2).encode('utf-8')
+
+def _excel_cell(value: Any) -> Any:
+    """Cell value for a workbook; nested structures are stored as JSON text"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+def _write_xlsx(out: BinaryIO, sheets: List[Tuple[str, Sequence[str], Iterable[Sequence[Any]]]]):
+    """Write (title, header, rows) sheets straight to an xlsx workbook
+    
+    Rows are streamed in order, so neither engine keeps a cell graph in memory.
+    """
+    if EXCEL_ENGINE == 'xlsxwriter':
+        import xlsxwriter
+        workbook = xlsxwriter.Workbook(out, {'constant_memory': True})
+        for title, header, rows in sheets:
+            worksheet = workbook.add_worksheet(title)
+            worksheet.write_row(0, 0, header)
+            for r, row in enumerate(rows, start=1):
+                worksheet.write_row(r, 0, [_excel_cell(v) for v in row])
+        workbook.close()
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        for title, header, rows in sheets:
+            worksheet = workbook.create_sheet(title)
+            worksheet.append(list(header))
+            for row in rows:
+                worksheet.append([_excel_cell(v) for v in row])
+        workbook.save(out)
+
+# Audio formats that are already compressed; deflating them again costs a lot
+# of CPU for almost no size reduction
+COMPRESSED_AUDIO_EXTENSIONS = {'.mp3', '.flac', '.ogg', '.m4a', '.opus', '.aac'}
+
+# gzip levels for archives of already-compressed audio and of raw PCM/text;
+# level 0 stores the data in gzip framing, so the archive stays a valid .tar.gz
+STORED_COMPRESSLEVEL = 0
+DEFAULT_COMPRESSLEVEL = 6
+# Mono archives are dominated by mono.wav PCM, which barely compresses past
+# level 1 while higher levels cost several times the CPU
+MONO_TAR_COMPRESSLEVEL = MINIO_CONFIG.get('tar_compresslevel', 1)
+
+def _is_compressed_audio(filename: str) -> bool:
+    """Whether filename is an already-compressed audio format"""
+    return Path(filename).suffix.lower() in COMPRESSED_AUDIO_EXTENSIONS
+
+def _original_files_compresslevel(music_files: List[MusicFile]) -> int:
+    """Pick the gzip level for an archive of original uploads"""
+    if all(_is_compressed_audio(f.original_filename) for f in music_files):
+        return STORED_COMPRESSLEVEL
+    return DEFAULT_COMPRESSLEVEL
+
+def _audio_zip_compress_type(filename: str) -> int:
+    """Zip compression for an audio member; compressed formats are stored as-is"""
+    return zipfile.ZIP_STORED if _is_compressed_audio(filename) else zipfile.ZIP_DEFLATED
+
+# Archive suffix and content type per compressor; pigz writes plain gzip
+ARCHIVE_TYPES = {
+    'gzip': ('.tar.gz', 'application/gzip'),
+    'pigz': ('.tar.gz', 'application/gzip'),
+    'zstd': ('.tar.zst', 'application/zstd'),
+}
+
+# zstd level giving both faster compression and a better ratio than gzip -6
+ZSTD_LEVEL = 3
+
+def _resolve_compressor(compressor: str) -> str:
+    """Return compressor if usable, falling back to in-process gzip"""
+    if compressor not in ARCHIVE_TYPES:
+        raise ValueError(f"Unsupported compressor: {compressor}")
+    if compressor != 'gzip' and shutil.which(compressor) is None:
+        print(f"{compressor} not found, falling back to gzip")
+        return 'gzip'
+    return compressor
+
+def _compressor_command(compressor: str, compresslevel: int) -> List[str]:
+    """Command line compressing stdin to stdout with all cores"""
+    if compressor == 'pigz':
+        return ['pigz', '-p', str(os.cpu_count() or 1), f'-{compresslevel}']
+    return ['zstd', '-T0', f'-{ZSTD_LEVEL}', '-q', '-c']
+
+# Copy buffer for member data, also used as the stream-mode ('w|') write
+# buffer; tarfile's 16 KiB and 10 KiB defaults make copying large audio files
+# dominated by per-call overhead
+COPY_BUFSIZE = 2 * 1024 * 1024
+
+# os.sendfile can write to any fd (pipes included) only on Linux
+_HAS_SENDFILE = sys.platform.startswith('linux')
+
+class _PipeWriter:
+    """Write-only file object over a pipe that tracks its own position"""
+    
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.position = 0
+    
+    def write(self, data: bytes) -> int:
+        self.raw.write(data)
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def flush(self):
+        self.raw.flush()
+    
+    def fileno(self) -> int:
+        return self.raw.fileno()
+
+class _SendfileTarFile(tarfile.TarFile):
+    """Uncompressed TarFile that copies member data with os.sendfile
+    
+    Used on top of a _PipeWriter feeding an external compressor, so file
+    contents go kernel-to-kernel instead of through Python bytes objects.
+    """
+    
+    def addfile(self, tarinfo, fileobj=None):
+        try:
+            infd = fileobj.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            return super().addfile(tarinfo, fileobj)
+        
+        self._check("awx")
+        buf = tarinfo.tobuf(self.format, self.encoding, self.errors)
+        self.fileobj.write(buf)
+        self.offset += len(buf)
+        self.fileobj.flush()
+        
+        outfd = self.fileobj.fileno()
+        position = fileobj.tell()
+        remaining = tarinfo.size
+        while remaining:
+            sent = os.sendfile(outfd, infd, position, remaining)
+            if sent == 0:
+                raise tarfile.ReadError("unexpected end of data")
+            position += sent
+            remaining -= sent
+        self.fileobj.position += tarinfo.size
+        
+        blocks, remainder = divmod(tarinfo.size, tarfile.BLOCKSIZE)
+        if remainder > 0:
+            self.fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+            blocks += 1
+        self.offset += blocks * tarfile.BLOCKSIZE
+        self.members.append(tarinfo)
+
+def _add_local_file(tar: tarfile.TarFile, path, arcname: str):
+    """Add a local file to tar, stat'ing it once through the open handle
+    
+    The header is built from fstat directly instead of gettarinfo, which
+    resolves the owner's user and group names (a pwd/grp lookup per member);
+    exported members carry no ownership, like the in-memory ones.
+    """
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        info = tarfile.TarInfo(name=arcname)
+        info.size = st.st_size
+        info.mtime = int(st.st_mtime)
+        info.mode = stat.S_IMODE(st.st_mode)
+        tar.addfile(info, f)
+
+@contextmanager
+def _open_tar_piped(command: List[str], out: BinaryIO) -> Iterator[tarfile.TarFile]:
+    """Write a tar stream through an external compressor process into out"""
+    try:
+        out.flush()
+        stdout = out.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        stdout = subprocess.PIPE
+    
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=stdout)
+    copier = None
+    if stdout == subprocess.PIPE:
+        # out has no file descriptor (e.g. BytesIO); pump the output into it
+        copier = threading.Thread(target=shutil.copyfileobj, args=(proc.stdout, out))
+        copier.start()
+    
+    try:
+        if _HAS_SENDFILE:
+            # In-memory members (MinIO payloads, metadata) still take the
+            # copyfileobj path, so give it the large buffer as well
+            tar = _SendfileTarFile(fileobj=_PipeWriter(proc.stdin), mode='w',
+                                   copybufsize=COPY_BUFSIZE)
+        else:
+            tar = tarfile.open(fileobj=proc.stdin, mode='w|', bufsize=COPY_BUFSIZE,
+                               copybufsize=COPY_BUFSIZE)
+        with tar:
+            yield tar
+    finally:
+        proc.stdin.close()
+        if copier is not None:
+            copier.join()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise RuntimeError(f"{command[0]} exited with status {returncode}")
+
+@contextmanager
+def _open_tar_gz(fileobj: BinaryIO, compresslevel: int = DEFAULT_COMPRESSLEVEL,
+                 compressor: str = 'gzip') -> Iterator[tarfile.TarFile]:
+    """Open a compressed tar writer streaming into fileobj"""
+    if compressor != 'gzip':
+        # tarfile compresses single-threaded; hand the stream to pigz/zstd
+        with _open_tar_piped(_compressor_command(compressor, compresslevel), fileobj) as tar:
+            yield tar
+        return
+    
+    # Stream mode never seeks, so fileobj may be a pipe or socket. tarfile only
+    # accepts compresslevel for 'w|gz' from Python 3.12, so gzip it ourselves
+    with gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=compresslevel) as gz:
+        with tarfile.open(fileobj=gz, mode='w|', bufsize=COPY_BUFSIZE,
+                          copybufsize=COPY_BUFSIZE) as tar:
+            yield tar
+
+# Archives of local files at least this large are built by the system tar
+# binary, which does the copying in native code instead of under the GIL
+SYSTEM_TAR_MIN_BYTES = 64 * 1024 * 1024
+
+async def _write_system_tar(files: Dict[str, str], out: BinaryIO, compresslevel: int,
+                            compressor: str = 'gzip') -> bool:
+    """Write a compressed tar of local files with the system tar binary
+    
+    Args:
+        files: Archive member name -> local path
+        out: File object receiving the compressed archive
+        compresslevel: Compression level passed to gzip/pigz
+        compressor: 'gzip', 'pigz' or 'zstd' (already resolved)
+    
+    Returns:
+        False without writing anything when tar is unavailable or the member
+        names cannot be staged, so the caller falls back to tarfile
+    """
+    tar_bin = shutil.which('tar')
+    if tar_bin is None or any('/' in name or name in ('.', '..') for name in files):
+        return False
+    
+    if compressor == 'gzip':
+        # The gzip binary has no store-only level 0
+        program = ['gzip', f'-{max(compresslevel, 1)}']
+    else:
+        program = _compressor_command(compressor, compresslevel)
+    
+    try:
+        out.flush()
+        stdout = out.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        stdout = asyncio.subprocess.PIPE
+    
+    with tempfile.TemporaryDirectory() as staging:
+        # Symlinks give each member its archive name; -h archives their targets
+        for name, path in files.items():
+            os.symlink(os.path.abspath(path), os.path.join(staging, name))
+        
+        proc = await asyncio.create_subprocess_exec(
+            tar_bin, '-h', '--numeric-owner', '-C', staging,
+            f"--use-compress-program={' '.join(program)}",
+            '-cf', '-', '--', *files,
+            stdout=stdout
+        )
+        content, _ = await proc.communicate()
+    
+    if proc.returncode != 0:
+        raise RuntimeError(f"tar exited with status {proc.returncode}")
+    if content:
+        out.write(content)
+    return True
+
+# Maximum MinIO downloads in flight per export, and how many payloads the
+# streaming tar writers may hold ahead of the one being written
+MINIO_FETCH_CONCURRENCY = 16
+MINIO_FETCH_AHEAD = 2 * MINIO_FETCH_CONCURRENCY
+
+# Batches larger than this are split into part archives bundled in one zip;
+# at most EXPORT_SEGMENT_CONCURRENCY parts are built (and held) at a time
+EXPORT_SEGMENT_SIZE = 5000
+EXPORT_SEGMENT_CONCURRENCY = 2
+
+def _minio_original_path(music_file: MusicFile) -> str:
+    """MinIO object name of an original upload"""
+    path_parts = Path(music_file.storage_path).parts
+    if 'original' in path_parts:
+        idx = path_parts.index('original')
+        return '/'.join(path_parts[idx:])
+    genre = getattr(music_file, 'genre', 'unknown')
+    return f"original/{genre}/{Path(music_file.storage_path).name}"
+
+def _minio_mono_path(music_file: MusicFile) -> str:
+    """MinIO object name of the processed mono WAV of an upload"""
+    path_parts = Path(music_file.storage_path).parts
+    if 'original' in path_parts:
+        idx = path_parts.index('original')
+        base_path = '/'.join(path_parts[idx+1:])
+        return f"processed/{Path(base_path).with_suffix('.mono.wav')}"
+    genre = getattr(music_file, 'genre', 'unknown')
+    return f"processed/{genre}/{Path(music_file.storage_path).stem}.mono.wav"
+
+def _local_mono_path(music_file: MusicFile) -> Path:
+    """Local path of the processed mono WAV of an upload"""
+    mono_path = Path(str(music_file.storage_path).replace('/original/', '/processed/'))
+    return mono_path.with_suffix('.mono.wav')
+
+def _read_minio_object(minio_client, object_name: str) -> bytes:
+    """Download a whole MinIO object"""
+    response = minio_client.get_object(
+        MINIO_CONFIG.get('bucket_name', 'music-analyzer'),
+        object_name
+    )
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+async def _fetch_minio_objects(minio_client, object_names: Dict[int, str]) -> Dict[int, Any]:
+    """Download MinIO objects concurrently
+    
+    Args:
+        minio_client: Client used for every download
+        object_names: Key -> MinIO object name
+    
+    Returns:
+        Key -> object bytes, or the exception raised while fetching it
+    """
+    semaphore = asyncio.Semaphore(MINIO_FETCH_CONCURRENCY)
+    
+    async def fetch(object_name: str) -> bytes:
+        async with semaphore:
+            return await asyncio.to_thread(_read_minio_object, minio_client, object_name)
+    
+    keys = list(object_names)
+    payloads = await asyncio.gather(*(fetch(object_names[key]) for key in keys),
+                                    return_exceptions=True)
+    return dict(zip(keys, payloads))
+
+def _existing_files(paths: Iterable[Path]) -> Set[Path]:
+    """Which of paths are existing regular files
+    
+    Directories holding several of the paths are listed once with os.scandir
+    instead of stat'ing every path, which matters on network storage.
+    """
+    by_dir = {}
+    for path in paths:
+        by_dir.setdefault(path.parent, set()).add(path.name)
+    
+    existing = set()
+    for directory, names in by_dir.items():
+        if len(names) == 1:
+            path = directory / next(iter(names))
+            if os.path.isfile(path):
+                existing.add(path)
+            continue
+        try:
+            with os.scandir(directory) as entries:
+                existing.update(directory / entry.name for entry in entries
+                                if entry.name in names and entry.is_file())
+        except OSError:
+            pass
+    return existing
+
+def _missing_mono_object(music_file: MusicFile, local_monos: Set[Path]) -> Optional[str]:
+    """MinIO object name of the mono WAV, or None when it is in local_monos"""
+    if _local_mono_path(music_file) in local_monos:
+        return None
+    return _minio_mono_path(music_file)
+
+def _iter_minio_payloads(minio_client, items: Sequence[Any],
+                         object_name: Callable[[Any], Optional[str]]) -> Iterator[Any]:
+    """Download the MinIO objects for items in worker threads, yielding them in order
+    
+    Runs alongside the consumer (the tar writer), keeping at most
+    MINIO_FETCH_AHEAD downloads in flight or waiting, so network transfers
+    overlap compression and memory stays bounded however many items there are.
+    
+    Args:
+        minio_client: Client used for every download
+        items: Items to fetch, one payload is yielded per item
+        object_name: Maps an item to its MinIO object name, or None to skip it
+    
+    Yields:
+        Object bytes, None for skipped items, or the exception raised while
+        fetching
+    """
+    def fetch(item) -> Any:
+        name = object_name(item)
+        return None if name is None else _read_minio_object(minio_client, name)
+    
+    with ThreadPoolExecutor(max_workers=MINIO_FETCH_CONCURRENCY) as pool:
+        remaining = iter(items)
+        pending = deque(pool.submit(fetch, item)
+                        for item in itertools.islice(remaining, MINIO_FETCH_AHEAD))
+        try:
+            while pending:
+                future = pending.popleft()
+                for item in itertools.islice(remaining, 1):
+                    pending.append(pool.submit(fetch, item))
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield e
+        finally:
+            for future in pending:
+                future.cancel()
+
+def _canonical_file_id(file_id: Any) -> Optional[str]:
+    """The canonical UUID string for a requested file id, or None if malformed
+    
+    music_files.id is a UUID column, so one malformed id would fail the whole
+    batch query; such ids are reported per file instead.
+    """
+    try:
+        return str(uuid.UUID(str(file_id)))
+    except ValueError:
+        return None
+
+def _transcription_txt(trans: Dict[str, Any]) -> bytes:
+    """Text file body for a serialized transcription, encoded in one step"""
+    return (f"Language: {trans.get('language', 'unknown')}\n"
+            f"Confidence: {trans.get('confidence', 0)}\n\n"
+            f"{trans.get('text', '')}").encode('utf-8')
+
+# Plain MusicFile/Lyrics columns copied as-is into the export dict
+_FILE_INFO_FIELDS = ('original_filename', 'file_format', 'duration', 'sample_rate',
+                     'channels', 'bit_depth', 'file_size')
+_file_info_values = attrgetter(*_FILE_INFO_FIELDS)
+_LYRICS_FIELDS = ('source', 'lyrics_text', 'confidence', 'language')
+_lyrics_values = attrgetter(*_LYRICS_FIELDS)
+
+# CSV columns per row type; rows are produced by C-level itemgetters
+_TRANSCRIPTION_CSV_FIELDS = ('id', 'text', 'language', 'confidence', 'created_at')
+_transcription_csv_row = itemgetter(*_TRANSCRIPTION_CSV_FIELDS)
+_LYRICS_CSV_FIELDS = ('id', 'source', 'lyrics_text', 'confidence', 'language', 'created_at')
+_lyrics_csv_row = itemgetter(*_LYRICS_CSV_FIELDS)
+
+# Columns the exporter reads per model; everything else is left unloaded
+_MUSIC_FILE_EXPORT_COLUMNS = _FILE_INFO_FIELDS + (
+    'id', 'uploaded_at', 'metadata', 'file_metadata', 'storage_path', 'genre'
+)
+_TRANSCRIPTION_EXPORT_COLUMNS = (
+    'id', 'transcription_text', 'language', 'confidence', 'word_timestamps', 'created_at'
+)
+_LYRICS_EXPORT_COLUMNS = ('id',) + _LYRICS_FIELDS + ('created_at',)
+
+def _load_only_columns(model, names: Sequence[str]):
+    """load_only() over the names that model actually maps as columns
+    
+    Optional attributes the exporter reads via getattr() may not be columns
+    at all, so they are filtered against the mapper instead of assumed.
+    """
+    columns = sa_inspect(model).column_attrs
+    return load_only(*(getattr(model, name) for name in names if name in columns))
+
+# Timestamp embedded in generated archive/export filenames
+FILENAME_TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S'
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    """ISO timestamp, or None when unset"""
+    return value.isoformat() if value else None
+
+def _serialize_music_file(music_file: MusicFile) -> Dict[str, Any]:
+    """Build the export dict for a music file and its loaded relationships"""
+    file_info = {'id': str(music_file.id)}
+    file_info.update(zip(_FILE_INFO_FIELDS, _file_info_values(music_file)))
+    file_info['uploaded_at'] = _isoformat(music_file.uploaded_at)
+    file_info['metadata'] = music_file.metadata
+    
+    lyrics = []
+    for l in (music_file.lyrics if hasattr(music_file, 'lyrics') else []):
+        entry = {'id': str(l.id)}
+        entry.update(zip(_LYRICS_FIELDS, _lyrics_values(l)))
+        entry['created_at'] = _isoformat(l.created_at)
+        lyrics.append(entry)
+    
+    return {
+        'file_info': file_info,
+        'transcriptions': [
+            {
+                'id': str(t.id),
+                'text': t.transcription_text,
+                'language': getattr(t, 'language', 'en'),
+                'confidence': t.confidence,
+                'word_timestamps': getattr(t, 'word_timestamps', None),
+                'created_at': _isoformat(t.created_at)
+            }
+            for t in music_file.transcriptions
+        ],
+        'lyrics': lyrics
+    }
+
 class MusicAnalyzerExporter:
     """Handles export of music analysis data in various formats"""
     
-    def __init__(self):
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
         self.supported_formats = ['json', 'csv', 'xlsx', 'zip', 'tar.gz', 'mono_tar.gz']
+        # Reused across exports so each call doesn't build a new engine/pool;
+        # created on first use so format-only callers never touch the database
+        self._db_manager = db_manager
+        self._minio_client = None
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        """Database manager shared by all exports"""
+        if self._db_manager is None:
+            self._db_manager = DatabaseManager(DATABASE_URL)
+        return self._db_manager
+    
+    def _get_minio_client(self):
+        """MinIO client shared with the API, created on first use"""
+        if self._minio_client is None:
+            from src.managers.minio_client import get_minio_client
+            self._minio_client = get_minio_client()
+        return self._minio_client
+    
+    async def export_music_file(self, file_id: str, format: str = 'json',
+                                fileobj: Optional[BinaryIO] = None,
+                                compresslevel: Optional[int] = None,
+                                compressor: str = 'gzip',
+                                include_txt: bool = False) -> Dict[str, Any]:
+        """Export a single music file with all its data
+        
+        For zip and tar.gz formats, passing fileobj streams the archive into it
+        instead of returning it as 'content', compresslevel overrides the gzip level
+        chosen for the payload, and compressor may be 'pigz' or 'zstd' as in
+        export_batch. include_txt adds per-transcription/lyrics .txt files to
+        mono_tar.gz next to metadata.json.
+        """
+        music_file, export_data = await self._gather_export_data(file_id)
+        
+        # Format based on requested type
+        if format == 'json':
+            return {
+                'format': 'json',
+                'content': _json_bytes(export_data).decode('utf-8'),
+                'filename': f"{music_file.original_filename}_export.json"
+            }
+        
+        elif format == 'csv':
+            return await asyncio.to_thread(self._export_to_csv, export_data, music_file.original_filename)
+        
+        elif format == 'xlsx':
+            return await asyncio.to_thread(self._export_to_excel, export_data, music_file.original_filename)
+        
+        elif format == 'zip':
+            return await self._export_to_zip(export_data, music_file, fileobj)
+        
+        elif format == 'tar.gz':
+            return await self._export_original_files_tar_gz(
+                [music_file], fileobj, compresslevel, compressor
+            )
+        
+        elif format == 'mono_tar.gz':
+            return await self._export_mono_files_tar_gz(
+                [music_file], export_data, fileobj, compresslevel, compressor, include_txt
+            )
+        
+        else:
+            raise ValueError(f"Unsupported format: {format}")
     
-    async def export_music_file(self, file_id: str, format: str = 'json') -> Dict[str, Any]:
-        """Export a single music file with all its data"""
-        db_manager = DatabaseManager(DATABASE_URL)
-        async for db in db_manager.get_session():
-            # Get music file with all related data
+    async def _gather_export_data(self, file_id: str) -> Tuple[MusicFile, Dict[str, Any]]:
+        """Load a music file and build its export dict
+        
+        The session is released before returning, so slow archive formats
+        don't hold a connection while they are written.
+        
+        Returns:
+            The loaded music file and its serialized export data
+        """
+        async for db in self.db_manager.get_session():
+            # Get music file with all related data in a single round-trip;
+            # any other relationship access raises instead of lazy-loading
             result = await db.execute(
                 select(MusicFile)
                 .options(
-                    selectinload(MusicFile.transcriptions),
-                    selectinload(MusicFile.lyrics)
+                    _load_only_columns(MusicFile, _MUSIC_FILE_EXPORT_COLUMNS),
+                    joinedload(MusicFile.transcriptions).options(
+                        _load_only_columns(Transcription, _TRANSCRIPTION_EXPORT_COLUMNS)
+                    ),
+                    joinedload(MusicFile.lyrics).options(
+                        _load_only_columns(Lyrics, _LYRICS_EXPORT_COLUMNS)
+                    ),
+                    raiseload('*')
                 )
                 .where(MusicFile.id == file_id)
             )
-            music_file = result.scalar_one_or_none()
+            music_file = result.unique().scalar_one_or_none()
             
             if not music_file:
                 raise ValueError(f"Music file not found: {file_id}")
             
-            # Prepare data for export
-            export_data = {
-                'file_info': {
-                    'id': str(music_file.id),
-                    'original_filename': music_file.original_filename,
-                    'file_format': music_file.file_format,
-                    'duration': music_file.duration,
-                    'sample_rate': music_file.sample_rate,
-                    'channels': music_file.channels,
-                    'bit_depth': music_file.bit_depth,
-                    'file_size': music_file.file_size,
-                    'uploaded_at': music_file.uploaded_at.isoformat() if music_file.uploaded_at else None,
-                    'metadata': music_file.metadata
-                },
-                'transcriptions': [
-                    {
-                        'id': str(t.id),
-                        'text': t.transcription_text,
-                        'language': getattr(t, 'language', 'en'),
-                        'confidence': t.confidence,
-                        'word_timestamps': getattr(t, 'word_timestamps', None),
-                        'created_at': t.created_at.isoformat() if t.created_at else None
-                    }
-                    for t in music_file.transcriptions
-                ],
-                'lyrics': [
-                    {
-                        'id': str(l.id),
-                        'source': l.source,
-                        'lyrics_text': l.lyrics_text,
-                        'confidence': l.confidence,
-                        'language': l.language,
-                        'created_at': l.created_at.isoformat() if l.created_at else None
-                    }
-                    for l in (music_file.lyrics if hasattr(music_file, 'lyrics') else [])
-                ]
-            }
-            
-            # Format based on requested type
-            if format == 'json':
-                return {
-                    'format': 'json',
-                    'content': json.dumps(export_data, indent=2),
-                    'filename': f"{music_file.original_filename}_export.json"
-                }
-            
-            elif format == 'csv':
-                return self._export_to_csv(export_data, music_file.original_filename)
-            
-            elif format == 'xlsx':
-                return self._export_to_excel(export_data, music_file.original_filename)
-            
-            elif format == 'zip':
-                return await self._export_to_zip(export_data, music_file)
-            
-            elif format == 'tar.gz':
-                return await self._export_original_files_tar_gz([music_file])
-            
-            elif format == 'mono_tar.gz':
-                return await self._export_mono_files_tar_gz([music_file], export_data)
-            
-            else:
-                raise ValueError(f"Unsupported format: {format}")
+            return music_file, _serialize_music_file(music_file)
+        raise ValueError(f"Music file not found: {file_id}")
     
     def _export_to_csv(self, data: Dict[str, Any], filename: str) -> Dict[str, Any]:
         """Export data to CSV format"""
@@ -114,29 +650,25 @@ class MusicAnalyzerExporter:
         
         # File info CSV
         file_info_csv = io.StringIO()
-        writer = csv.DictWriter(file_info_csv, fieldnames=data['file_info'].keys())
-        writer.writeheader()
-        writer.writerow(data['file_info'])
+        writer = csv.writer(file_info_csv)
+        writer.writerow(data['file_info'].keys())
+        writer.writerow(data['file_info'].values())
         csv_files['file_info.csv'] = file_info_csv.getvalue()
         
         # Transcriptions CSV
         if data['transcriptions']:
             trans_csv = io.StringIO()
-            fieldnames = ['id', 'text', 'language', 'confidence', 'created_at']
-            writer = csv.DictWriter(trans_csv, fieldnames=fieldnames)
-            writer.writeheader()
-            for t in data['transcriptions']:
-                writer.writerow({k: t.get(k) for k in fieldnames})
+            writer = csv.writer(trans_csv)
+            writer.writerow(_TRANSCRIPTION_CSV_FIELDS)
+            writer.writerows(map(_transcription_csv_row, data['transcriptions']))
             csv_files['transcriptions.csv'] = trans_csv.getvalue()
         
         # Lyrics CSV
         if data.get('lyrics'):
             lyrics_csv = io.StringIO()
-            fieldnames = ['id', 'source', 'lyrics_text', 'confidence', 'language', 'created_at']
-            writer = csv.DictWriter(lyrics_csv, fieldnames=fieldnames)
-            writer.writeheader()
-            for l in data['lyrics']:
-                writer.writerow({k: l.get(k) for k in fieldnames})
+            writer = csv.writer(lyrics_csv)
+            writer.writerow(_LYRICS_CSV_FIELDS)
+            writer.writerows(map(_lyrics_csv_row, data['lyrics']))
             csv_files['lyrics.csv'] = lyrics_csv.getvalue()
         
         # Create a zip file with all CSVs
@@ -156,23 +688,23 @@ class MusicAnalyzerExporter:
         """Export data to Excel format"""
         excel_buffer = io.BytesIO()
         
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            # File info sheet
-            df_info = pd.DataFrame([data['file_info']])
-            df_info.to_excel(writer, sheet_name='File Info', index=False)
-            
-            # Transcriptions sheet
-            if data['transcriptions']:
-                df_trans = pd.DataFrame(data['transcriptions'])
-                # Remove complex fields for Excel
-                if 'word_timestamps' in df_trans.columns:
-                    df_trans = df_trans.drop('word_timestamps', axis=1)
-                df_trans.to_excel(writer, sheet_name='Transcriptions', index=False)
-            
-            # Lyrics sheet
-            if data.get('lyrics'):
-                df_lyrics = pd.DataFrame(data['lyrics'])
-                df_lyrics.to_excel(writer, sheet_name='Lyrics', index=False)
+        # File info sheet
+        info = data['file_info']
+        sheets = [('File Info', list(info), [list(info.values())])]
+        
+        # Transcriptions sheet, without complex fields
+        if data['transcriptions']:
+            fieldnames = [k for k in data['transcriptions'][0] if k != 'word_timestamps']
+            sheets.append(('Transcriptions', fieldnames,
+                           ([t.get(k) for k in fieldnames] for t in data['transcriptions'])))
+        
+        # Lyrics sheet
+        if data.get('lyrics'):
+            fieldnames = list(data['lyrics'][0])
+            sheets.append(('Lyrics', fieldnames,
+                           ([l.get(k) for k in fieldnames] for l in data['lyrics'])))
+        
+        _write_xlsx(excel_buffer, sheets)
         
         excel_buffer.seek(0)
         
@@ -183,172 +715,183 @@ class MusicAnalyzerExporter:
             'content_type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         }
     
-    async def _export_to_zip(self, data: Dict[str, Any], music_file: MusicFile) -> Dict[str, Any]:
-        """Export data with original audio file in a zip"""
-        zip_buffer = io.BytesIO()
+    async def _export_to_zip(self, data: Dict[str, Any], music_file: MusicFile,
+                             fileobj: Optional[BinaryIO] = None) -> Dict[str, Any]:
+        """Export data with original audio file in a zip, streamed into fileobj when given"""
+        # ZipFile writes data descriptors on unseekable outputs, so fileobj
+        # may be a pipe or spooled response body
+        zip_buffer = io.BytesIO() if fileobj is None else None
         
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Add JSON data
-            zip_file.writestr('data.json', json.dumps(data, indent=2))
-            
-            # Add transcriptions as text files
-            for i, trans in enumerate(data['transcriptions']):
-                zip_file.writestr(
-                    f'transcription_{i+1}.txt',
-                    f"Language: {trans['language']}\n"
-                    f"Confidence: {trans['confidence']}\n\n"
-                    f"{trans['text']}"
-                )
-            
-            # Add lyrics as text files
-            for i, lyrics in enumerate(data.get('lyrics', [])):
-                if lyrics.get('lyrics_text'):
+        # Compress and copy the audio in a worker thread, off the event loop
+        def write_archive():
+            with zipfile.ZipFile(zip_buffer if fileobj is None else fileobj, 'w', zipfile.ZIP_DEFLATED,
+                                 compresslevel=DEFAULT_COMPRESSLEVEL) as zip_file:
+                # Add JSON data
+                zip_file.writestr('data.json', _json_bytes(data))
+                
+                # Add transcriptions as text files
+                for i, trans in enumerate(data['transcriptions']):
                     zip_file.writestr(
-                        f'lyrics_{lyrics.get("source", "unknown")}_{i+1}.txt',
-                        lyrics['lyrics_text']
+                        f'transcription_{i+1}.txt',
+                        f"Language: {trans['language']}\n"
+                        f"Confidence: {trans['confidence']}\n\n"
+                        f"{trans['text']}"
                     )
-            
-            # Add original audio file if available
-            if music_file.storage_path:
-                try:
-                    # Try to read from local storage first
-                    if Path(music_file.storage_path).exists():
-                        with open(music_file.storage_path, 'rb') as f:
-                            audio_data = f.read()
+                
+                # Add lyrics as text files
+                for i, lyrics in enumerate(data.get('lyrics', [])):
+                    if lyrics.get('lyrics_text'):
                         zip_file.writestr(
-                            f"audio/{music_file.original_filename}",
-                            audio_data
+                            f'lyrics_{lyrics.get("source", "unknown")}_{i+1}.txt',
+                            lyrics['lyrics_text']
                         )
-                    else:
-                        # Fall back to MinIO if local file not found
-                        from minio import Minio
-                        minio_client = Minio(
-                            f"{MINIO_CONFIG['host']}:{MINIO_CONFIG['port']}",
-                            access_key=MINIO_CONFIG['access_key'],
-                            secret_key=MINIO_CONFIG['secret_key'],
-                            secure=MINIO_CONFIG['secure']
-                        )
-                        
-                        # Construct MinIO path from storage path
-                        # Extract genre from path (e.g., /path/to/original/genre/file.mp3)
-                        path_parts = Path(music_file.storage_path).parts
-                        if 'original' in path_parts:
-                            idx = path_parts.index('original')
-                            minio_path = '/'.join(path_parts[idx:])
+                
+                # Add original audio file if available
+                audio_compress_type = _audio_zip_compress_type(music_file.original_filename)
+                if music_file.storage_path:
+                    try:
+                        # Try to read from local storage first
+                        if Path(music_file.storage_path).exists():
+                            # Stream the file in instead of reading it whole
+                            audio_info = zipfile.ZipInfo.from_file(
+                                music_file.storage_path, f"audio/{music_file.original_filename}"
+                            )
+                            audio_info.compress_type = audio_compress_type
+                            with open(music_file.storage_path, 'rb') as src, \
+                                    zip_file.open(audio_info, 'w') as dst:
+                                shutil.copyfileobj(src, dst, COPY_BUFSIZE)
                         else:
-                            # Fallback: use genre and filename
-                            genre = getattr(music_file, 'genre', 'unknown')
-                            minio_path = f"original/{genre}/{Path(music_file.storage_path).name}"
-                        
-                        response = minio_client.get_object(
-                            MINIO_CONFIG.get('bucket_name', 'music-analyzer'),
-                            minio_path
-                        )
-                    audio_data = response.read()
-                    response.close()
-                    response.release_conn()
-                    
-                    zip_file.writestr(
-                        f"audio/{music_file.original_filename}",
-                        audio_data
-                    )
-                except Exception as e:
-                    # Log error but continue export
-                    print(f"Error adding audio file: {e}")
+                            # Fall back to MinIO if local file not found
+                            response = self._get_minio_client().get_object(
+                                MINIO_CONFIG.get('bucket_name', 'music-analyzer'),
+                                _minio_original_path(music_file)
+                            )
+                            try:
+                                # Size is unknown up front, so allow zip64 for the entry
+                                audio_info = zipfile.ZipInfo(
+                                    f"audio/{music_file.original_filename}",
+                                    date_time=datetime.now().timetuple()[:6]
+                                )
+                                audio_info.compress_type = audio_compress_type
+                                with zip_file.open(audio_info, 'w', force_zip64=True) as dst:
+                                    for chunk in response.stream(COPY_BUFSIZE):
+                                        dst.write(chunk)
+                            finally:
+                                response.close()
+                                response.release_conn()
+                    except Exception as e:
+                        # Log error but continue export
+                        print(f"Error adding audio file: {e}")
         
-        zip_buffer.seek(0)
+        await asyncio.to_thread(write_archive)
         
         return {
             'format': 'zip',
-            'content': zip_buffer.getvalue(),
+            'content': zip_buffer.getvalue() if zip_buffer is not None else None,
             'filename': f"{music_file.original_filename}_complete_export.zip",
             'content_type': 'application/zip'
         }
     
-    async def export_batch(self, file_ids: List[str], format: str = 'json') -> Dict[str, Any]:
-        """Export multiple music files"""
+    async def _fetch_music_files(self, file_ids: List[str]) -> Dict[str, MusicFile]:
+        """Load the given music files with their relationships in one query"""
+        if not file_ids:
+            return {}
+        async for db in self.db_manager.get_session():
+            result = await db.execute(
+                select(MusicFile)
+                .options(
+                    _load_only_columns(MusicFile, _MUSIC_FILE_EXPORT_COLUMNS),
+                    selectinload(MusicFile.transcriptions).options(
+                        _load_only_columns(Transcription, _TRANSCRIPTION_EXPORT_COLUMNS)
+                    ),
+                    selectinload(MusicFile.lyrics).options(
+                        _load_only_columns(Lyrics, _LYRICS_EXPORT_COLUMNS)
+                    ),
+                    raiseload('*')
+                )
+                .where(MusicFile.id.in_(file_ids))
+            )
+            return {str(music_file.id): music_file for music_file in result.scalars().all()}
+        return {}
+    
+    async def export_batch(self, file_ids: List[str], format: str = 'json',
+                           fileobj: Optional[BinaryIO] = None,
+                           compresslevel: Optional[int] = None,
+                           compressor: str = 'gzip',
+                           segment_size: int = EXPORT_SEGMENT_SIZE,
+                           include_txt: bool = False,
+                           started_at: Optional[datetime] = None) -> Dict[str, Any]:
+        """Export multiple music files
+        
+        For archive formats (everything but json), passing fileobj streams the
+        archive into it instead of returning it as 'content', and compresslevel
+        overrides the gzip level chosen for the payload. compressor may be
+        'pigz' or 'zstd' to compress on all cores with that binary (zstd yields
+        a .tar.zst archive); it falls back to 'gzip' when the binary is not
+        installed. More than segment_size files are exported as a zip of
+        per-segment parts plus a manifest.json, reported as format 'zip' with
+        the parts' format in 'part_format'. include_txt is passed on to
+        mono_tar.gz as in export_music_file. started_at is the batch's clock
+        reading, passed down so segment parts share it; it defaults to now.
+        """
+        # One clock read per batch, shared by export_date and the filenames
+        if started_at is None:
+            started_at = datetime.utcnow()
+        timestamp = started_at.strftime(FILENAME_TIMESTAMP_FORMAT)
+        
+        if len(file_ids) > segment_size:
+            return await self._export_batch_segmented(
+                file_ids, format, fileobj, compresslevel, compressor, segment_size, include_txt,
+                started_at
+            )
+        
+        # One query for the well-formed ids of the batch; iterate file_ids to
+        # keep the request order
+        canonical_ids = {file_id: _canonical_file_id(file_id) for file_id in file_ids}
+        files_by_id = await self._fetch_music_files(
+            list({canonical for canonical in canonical_ids.values() if canonical is not None})
+        )
+        
         # Handle tar.gz formats specially
         if format in ['tar.gz', 'mono_tar.gz']:
-            db_manager = DatabaseManager(DATABASE_URL)
-            music_files = []
-            
-            async for db in db_manager.get_session():
-                for file_id in file_ids:
-                    result = await db.execute(
-                        select(MusicFile)
-                        .options(
-                            selectinload(MusicFile.transcriptions),
-                            selectinload(MusicFile.lyrics)
-                        )
-                        .where(MusicFile.id == file_id)
-                    )
-                    music_file = result.scalar_one_or_none()
-                    if music_file:
-                        music_files.append(music_file)
+            music_files = [files_by_id[canonical_ids[file_id]] for file_id in file_ids
+                           if canonical_ids[file_id] in files_by_id]
             
             if format == 'tar.gz':
-                return await self._export_original_files_tar_gz(music_files)
+                return await self._export_original_files_tar_gz(
+                    music_files, fileobj, compresslevel, compressor, timestamp
+                )
             else:  # mono_tar.gz
                 # Collect all export data
-                all_exports = []
-                for music_file in music_files:
-                    export_data = {
-                        'file_info': {
-                            'id': str(music_file.id),
-                            'original_filename': music_file.original_filename,
-                            'file_format': music_file.file_format,
-                            'duration': music_file.duration,
-                            'sample_rate': music_file.sample_rate,
-                            'channels': music_file.channels,
-                            'bit_depth': music_file.bit_depth,
-                            'file_size': music_file.file_size,
-                            'uploaded_at': music_file.uploaded_at.isoformat() if music_file.uploaded_at else None,
-                            'metadata': music_file.metadata
-                        },
-                        'transcriptions': [
-                            {
-                                'id': str(t.id),
-                                'text': t.transcription_text,
-                                'language': getattr(t, 'language', 'en'),
-                                'confidence': t.confidence,
-                                'word_timestamps': getattr(t, 'word_timestamps', None),
-                                'created_at': t.created_at.isoformat() if t.created_at else None
-                            }
-                            for t in music_file.transcriptions
-                        ],
-                        'lyrics': [
-                            {
-                                'id': str(l.id),
-                                'source': l.source,
-                                'lyrics_text': l.lyrics_text,
-                                'confidence': l.confidence,
-                                'language': l.language,
-                                'created_at': l.created_at.isoformat() if l.created_at else None
-                            }
-                            for l in (music_file.lyrics if hasattr(music_file, 'lyrics') else [])
-                        ]
-                    }
-                    all_exports.append(export_data)
+                all_exports = [_serialize_music_file(music_file) for music_file in music_files]
                 
                 # Create mono tar.gz with all files
-                return await self._export_mono_files_tar_gz_batch(music_files, all_exports)
+                return await self._export_mono_files_tar_gz_batch(
+                    music_files, all_exports, fileobj, compresslevel, compressor, include_txt,
+                    timestamp
+                )
         
         # Original implementation for other formats
         exports = []
         
         for file_id in file_ids:
-            try:
-                export = await self.export_music_file(file_id, 'json')
-                exports.append(json.loads(export['content']))
-            except Exception as e:
+            music_file = files_by_id.get(canonical_ids[file_id])
+            if music_file:
+                exports.append(_serialize_music_file(music_file))
+            elif canonical_ids[file_id] is None:
                 exports.append({
                     'file_id': file_id,
-                    'error': str(e)
+                    'error': f"Invalid file ID: {file_id}"
+                })
+            else:
+                exports.append({
+                    'file_id': file_id,
+                    'error': f"Music file not found: {file_id}"
                 })
         
         # Combine exports
         combined_data = {
-            'export_date': datetime.utcnow().isoformat(),
+            'export_date': started_at.isoformat(),
             'total_files': len(file_ids),
             'files': exports
         }
@@ -356,40 +899,105 @@ class MusicAnalyzerExporter:
         if format == 'json':
             return {
                 'format': 'json',
-                'content': json.dumps(combined_data, indent=2),
-                'filename': f"batch_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+                'content': _json_bytes(combined_data).decode('utf-8'),
+                'filename': f"batch_export_{timestamp}.json"
             }
         else:
+            # Build the individual exports concurrently in worker threads
+            # (zlib and the workbook writers release the GIL while compressing)
+            builders = {
+                'csv': (self._export_to_csv, 'zip'),
+                'xlsx': (self._export_to_excel, 'xlsx'),
+            }
+            members = []
+            if format in builders:
+                build, extension = builders[format]
+                pending = [
+                    (export.get('file_info', {}).get('original_filename', f'file_{i+1}'), export)
+                    for i, export in enumerate(exports)
+                    if 'error' not in export
+                ]
+                built = await asyncio.gather(*(
+                    asyncio.to_thread(build, export, filename) for filename, export in pending
+                ))
+                members = [
+                    (f"{filename}.{extension}", result['content'])
+                    for (filename, _), result in zip(pending, built)
+                ]
+            
             # For other formats, create a zip with individual exports
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            zip_buffer = io.BytesIO() if fileobj is None else None
+            with zipfile.ZipFile(zip_buffer if fileobj is None else fileobj, 'w', zipfile.ZIP_DEFLATED,
+                                 compresslevel=DEFAULT_COMPRESSLEVEL) as zip_file:
                 # Add summary
-                zip_file.writestr('summary.json', json.dumps(combined_data, indent=2))
+                zip_file.writestr('summary.json', _json_bytes(combined_data))
                 
                 # Add individual exports
-                for i, export in enumerate(exports):
-                    if 'error' not in export:
-                        filename = export.get('file_info', {}).get('original_filename', f'file_{i+1}')
-                        if format == 'csv':
-                            csv_export = self._export_to_csv(export, filename)
-                            zip_file.writestr(f"{filename}.zip", csv_export['content'])
-                        elif format == 'xlsx':
-                            xlsx_export = self._export_to_excel(export, filename)
-                            zip_file.writestr(f"{filename}.xlsx", xlsx_export['content'])
-            
-            zip_buffer.seek(0)
+                for member_name, content in members:
+                    zip_file.writestr(member_name, content)
             
             return {
                 'format': format,
-                'content': zip_buffer.getvalue(),
-                'filename': f"batch_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.zip",
+                'content': zip_buffer.getvalue() if zip_buffer is not None else None,
+                'filename': f"batch_export_{timestamp}.zip",
                 'content_type': 'application/zip'
             }
     
+    async def _export_batch_segmented(self, file_ids: List[str], format: str,
+                                      fileobj: Optional[BinaryIO], compresslevel: Optional[int],
+                                      compressor: str, segment_size: int,
+                                      include_txt: bool, started_at: datetime) -> Dict[str, Any]:
+        """Export file_ids in segments, bundling the parts in one zip
+        
+        The result is always a zip, whatever format the parts are in; that
+        format is reported as 'part_format' and in manifest.json.
+        """
+        segments = [file_ids[i:i + segment_size] for i in range(0, len(file_ids), segment_size)]
+        semaphore = asyncio.Semaphore(EXPORT_SEGMENT_CONCURRENCY)
+        
+        async def export_segment(index: int, segment: List[str]):
+            async with semaphore:
+                part = await self.export_batch(segment, format, compresslevel=compresslevel,
+                                               compressor=compressor, segment_size=segment_size,
+                                               include_txt=include_txt, started_at=started_at)
+            return index, part
+        
+        manifest = {
+            'export_date': started_at.isoformat(),
+            'format': format,
+            'total_files': len(file_ids),
+            'segment_size': segment_size,
+            'parts': [None] * len(segments)
+        }
+        
+        zip_buffer = io.BytesIO() if fileobj is None else None
+        with zipfile.ZipFile(zip_buffer if fileobj is None else fileobj, 'w', zipfile.ZIP_STORED) as zip_file:
+            # Write each part as soon as it is ready so it can be freed
+            for next_part in asyncio.as_completed(
+                [export_segment(i, segment) for i, segment in enumerate(segments)]
+            ):
+                index, part = await next_part
+                part_name = f"part_{index + 1:03d}_{part['filename']}"
+                content = part['content']
+                if isinstance(content, str):
+                    zip_file.writestr(part_name, content, compress_type=zipfile.ZIP_DEFLATED)
+                else:
+                    zip_file.writestr(part_name, content)
+                manifest['parts'][index] = {'filename': part_name, 'file_ids': segments[index]}
+            
+            zip_file.writestr('manifest.json', _json_bytes(manifest), compress_type=zipfile.ZIP_DEFLATED)
+        
+        return {
+            'format': 'zip',
+            'part_format': format,
+            'content': zip_buffer.getvalue() if zip_buffer is not None else None,
+            'filename': f"batch_export_{started_at.strftime(FILENAME_TIMESTAMP_FORMAT)}_parts.zip",
+            'content_type': 'application/zip'
+        }
+    
     async def export_search_history(self, search_id: str, format: str = 'json') -> Dict[str, Any]:
         """Export search history"""
-        db_manager = DatabaseManager(DATABASE_URL)
-        async for db in db_manager.get_session():
+        async for db in self.db_manager.get_session():
             result = await db.execute(
                 select(SearchHistory)
                 .where(SearchHistory.id == search_id)
@@ -413,7 +1021,7 @@ class MusicAnalyzerExporter:
             if format == 'json':
                 return {
                     'format': 'json',
-                    'content': json.dumps(export_data, indent=2),
+                    'content': _json_bytes(export_data).decode('utf-8'),
                     'filename': f"search_{search_history.search_type}_{search_history.id}.json"
                 }
             else:
@@ -433,7 +1041,7 @@ class MusicAnalyzerExporter:
                     }
                 elif format == 'xlsx':
                     excel_buffer = io.BytesIO()
-                    df.to_excel(excel_buffer, index=False)
+                    df.to_excel(excel_buffer, index=False, engine=EXCEL_ENGINE)
                     excel_buffer.seek(0)
                     return {
                         'format': 'xlsx',
@@ -442,169 +1050,159 @@ class MusicAnalyzerExporter:
                         'content_type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
                     }
     
-    async def _export_original_files_tar_gz(self, music_files: List[MusicFile]) -> Dict[str, Any]:
-        """Export original uploaded files as tar.gz archive"""
-        from minio import Minio
+    async def _export_original_files_tar_gz(self, music_files: List[MusicFile],
+                                            fileobj: Optional[BinaryIO] = None,
+                                            compresslevel: Optional[int] = None,
+                                            compressor: str = 'gzip',
+                                            timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Export original uploaded files as tar.gz archive
         
-        # Create temporary file for tar.gz
-        with tempfile.NamedTemporaryFile(suffix='.tar.gz', delete=False) as tmp_file:
-            tar_path = tmp_file.name
+        timestamp names a multi-file archive; it defaults to the current time.
+        """
+        if compresslevel is None:
+            compresslevel = _original_files_compresslevel(music_files)
+        compressor = _resolve_compressor(compressor)
+        suffix, content_type = ARCHIVE_TYPES[compressor]
+        # Build the archive in memory unless streaming to the caller
+        buf = io.BytesIO() if fileobj is None else None
         
-        try:
-            # Initialize MinIO client
-            minio_client = Minio(
-                f"{MINIO_CONFIG['host']}:{MINIO_CONFIG['port']}",
-                access_key=MINIO_CONFIG['access_key'],
-                secret_key=MINIO_CONFIG['secret_key'],
-                secure=MINIO_CONFIG['secure']
-            )
+        minio_client = self._get_minio_client()
+        
+        out = buf if fileobj is None else fileobj
+        
+        # Large archives of local files (with unique names) go through system tar
+        local_files = {}
+        for music_file in music_files:
+            if not music_file.storage_path or not Path(music_file.storage_path).exists():
+                break
+            local_files[music_file.original_filename] = music_file.storage_path
+        used_system_tar = (
+            len(local_files) == len(music_files) > 0
+            and sum(os.path.getsize(path) for path in local_files.values()) >= SYSTEM_TAR_MIN_BYTES
+            and await _write_system_tar(local_files, out, compresslevel, compressor)
+        )
+        
+        # Create tar.gz archive
+        if not used_system_tar:
+            # Download everything missing locally up front, concurrently
+            payloads = await _fetch_minio_objects(minio_client, {
+                i: _minio_original_path(music_file)
+                for i, music_file in enumerate(music_files)
+                if music_file.storage_path and not Path(music_file.storage_path).exists()
+            })
             
-            # Create tar.gz archive
-            with tarfile.open(tar_path, 'w:gz') as tar:
-                for music_file in music_files:
-                    if music_file.storage_path:
-                        try:
-                            # Try local storage first
-                            if Path(music_file.storage_path).exists():
-                                tar.add(music_file.storage_path, arcname=music_file.original_filename)
-                            else:
-                                # Get file from MinIO
-                                path_parts = Path(music_file.storage_path).parts
-                                if 'original' in path_parts:
-                                    idx = path_parts.index('original')
-                                    minio_path = '/'.join(path_parts[idx:])
+            # Assemble and compress the archive in a worker thread so the event
+            # loop keeps serving other requests (zlib releases the GIL)
+            def write_archive():
+                with _open_tar_gz(out, compresslevel, compressor) as tar:
+                    for i, music_file in enumerate(music_files):
+                        if music_file.storage_path:
+                            try:
+                                # Try local storage first
+                                if Path(music_file.storage_path).exists():
+                                    _add_local_file(tar, music_file.storage_path, music_file.original_filename)
                                 else:
-                                    genre = getattr(music_file, 'genre', 'unknown')
-                                    minio_path = f"original/{genre}/{Path(music_file.storage_path).name}"
-                                
-                                response = minio_client.get_object(
-                                    MINIO_CONFIG.get('bucket_name', 'music-analyzer'),
-                                    minio_path
-                                )
-                                
-                                # Create temporary file for audio
-                                with tempfile.NamedTemporaryFile(suffix=Path(music_file.original_filename).suffix, delete=False) as audio_tmp:
-                                    audio_tmp.write(response.read())
-                                    audio_tmp_path = audio_tmp.name
-                                
-                                response.close()
-                                response.release_conn()
-                                
-                                # Add to tar archive
-                                tar.add(audio_tmp_path, arcname=music_file.original_filename)
-                                
-                                # Clean up temp file
-                                Path(audio_tmp_path).unlink()
+                                    # File fetched from MinIO
+                                    audio_data = payloads.pop(i)
+                                    if isinstance(audio_data, Exception):
+                                        raise audio_data
+                                    
+                                    # Add to tar archive straight from memory
+                                    audio_info = tarfile.TarInfo(name=music_file.original_filename)
+                                    audio_info.size = len(audio_data)
+                                    tar.addfile(audio_info, io.BytesIO(audio_data))
                             
-                        except Exception as e:
-                            print(f"Error adding file {music_file.original_filename}: {e}")
-            
-            # Read tar.gz content
-            with open(tar_path, 'rb') as f:
-                tar_content = f.read()
-            
-            # Generate filename
-            if len(music_files) == 1:
-                base_filename = Path(music_files[0].original_filename).stem
-            else:
-                base_filename = f"music_files_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-            
-            return {
-                'format': 'tar.gz',
-                'content': tar_content,
-                'filename': f"{base_filename}_original.tar.gz",
-                'content_type': 'application/gzip'
-            }
+                            except Exception as e:
+                                print(f"Error adding file {music_file.original_filename}: {e}")
             
-        finally:
-            # Clean up temp file
-            if Path(tar_path).exists():
-                Path(tar_path).unlink()
+            await asyncio.to_thread(write_archive)
+        
+        # Archive content (already written out when streaming)
+        tar_content = buf.getvalue() if buf is not None else None
+        
+        # Generate filename
+        if len(music_files) == 1:
+            base_filename = Path(music_files[0].original_filename).stem
+        else:
+            if timestamp is None:
+                timestamp = datetime.utcnow().strftime(FILENAME_TIMESTAMP_FORMAT)
+            base_filename = f"music_files_{timestamp}"
+        
+        return {
+            'format': 'tar.gz',
+            'content': tar_content,
+            'filename': f"{base_filename}_original{suffix}",
+            'content_type': content_type
+        }
     
-    async def _export_mono_files_tar_gz(self, music_files: List[MusicFile], export_data: Optional[Dict] = None) -> Dict[str, Any]:
-        """Export mono converted files with all metadata as tar.gz archive"""
-        from minio import Minio
+    async def _export_mono_files_tar_gz(self, music_files: List[MusicFile], export_data: Optional[Dict] = None,
+                                        fileobj: Optional[BinaryIO] = None,
+                                        compresslevel: Optional[int] = None,
+                                        compressor: str = 'gzip',
+                                        include_txt: bool = False) -> Dict[str, Any]:
+        """Export mono converted files with all metadata as tar.gz archive
         
-        # Create temporary file for tar.gz
-        with tempfile.NamedTemporaryFile(suffix='.tar.gz', delete=False) as tmp_file:
-            tar_path = tmp_file.name
+        metadata.json already holds the transcriptions and lyrics; include_txt
+        additionally writes each of them as a separate .txt file.
+        """
+        if compresslevel is None:
+            compresslevel = MONO_TAR_COMPRESSLEVEL
+        compressor = _resolve_compressor(compressor)
+        suffix, content_type = ARCHIVE_TYPES[compressor]
+        # Build the archive in memory unless streaming to the caller
+        buf = io.BytesIO() if fileobj is None else None
         
-        try:
-            # Initialize MinIO client
-            minio_client = Minio(
-                f"{MINIO_CONFIG['host']}:{MINIO_CONFIG['port']}",
-                access_key=MINIO_CONFIG['access_key'],
-                secret_key=MINIO_CONFIG['secret_key'],
-                secure=MINIO_CONFIG['secure']
+        minio_client = self._get_minio_client()
+        
+        # Write the archive off the event loop; mono files missing locally are
+        # downloaded concurrently ahead of the writer
+        def write_archive():
+            local_monos = _existing_files(map(_local_mono_path, music_files))
+            mono_payloads = _iter_minio_payloads(
+                minio_client, music_files, partial(_missing_mono_object, local_monos=local_monos)
             )
-            
-            # Create tar.gz archive
-            with tarfile.open(tar_path, 'w:gz') as tar:
-                for music_file in music_files:
+            with closing(mono_payloads), \
+                    _open_tar_gz(buf if fileobj is None else fileobj, compresslevel, compressor) as tar:
+                for music_file, mono_data in zip(music_files, mono_payloads):
                     # Create a directory for each file
                     file_dir = Path(music_file.original_filename).stem
                     
-                    # Add mono audio file if exists
-                    # Check for mono file in processed directory
-                    mono_path = Path(str(music_file.storage_path).replace('/original/', '/processed/'))
-                    mono_path = mono_path.with_suffix('.mono.wav')
-                    
-                    if mono_path.exists():
+                    # Add mono audio file from the processed directory
+                    if mono_data is None:
                         try:
-                            tar.add(mono_path, arcname=f"{file_dir}/mono.wav")
+                            _add_local_file(tar, _local_mono_path(music_file), f"{file_dir}/mono.wav")
                         except Exception as e:
                             print(f"Error adding mono file: {e}")
                     else:
-                        # Try MinIO for mono file
+                        # Mono file fetched from MinIO
                         try:
-                            path_parts = Path(music_file.storage_path).parts
-                            if 'original' in path_parts:
-                                idx = path_parts.index('original')
-                                base_path = '/'.join(path_parts[idx+1:])
-                                minio_mono_path = f"processed/{Path(base_path).with_suffix('.mono.wav')}"
-                            else:
-                                genre = getattr(music_file, 'genre', 'unknown')
-                                minio_mono_path = f"processed/{genre}/{Path(music_file.storage_path).stem}.mono.wav"
-                            
-                            response = minio_client.get_object(
-                                MINIO_CONFIG.get('bucket_name', 'music-analyzer'),
-                                minio_mono_path
-                            )
-                            
-                            with tempfile.NamedTemporaryFile(suffix='_mono.wav', delete=False) as mono_tmp:
-                                mono_tmp.write(response.read())
-                                mono_tmp_path = mono_tmp.name
-                            
-                            response.close()
-                            response.release_conn()
-                            
-                            tar.add(mono_tmp_path, arcname=f"{file_dir}/mono.wav")
-                            Path(mono_tmp_path).unlink()
+                            if isinstance(mono_data, Exception):
+                                raise mono_data
                             
+                            mono_info = tarfile.TarInfo(name=f"{file_dir}/mono.wav")
+                            mono_info.size = len(mono_data)
+                            tar.addfile(mono_info, io.BytesIO(mono_data))
+                        
                         except Exception as e:
                             print(f"Error adding mono file from MinIO: {e}")
                     
                     # Add metadata JSON
                     if export_data:
-                        metadata_content = json.dumps(export_data, indent=2).encode('utf-8')
+                        metadata_content = _json_bytes(export_data)
                         metadata_info = tarfile.TarInfo(name=f"{file_dir}/metadata.json")
                         metadata_info.size = len(metadata_content)
                         tar.addfile(metadata_info, io.BytesIO(metadata_content))
                     
-                    # Add transcriptions
-                    if export_data and export_data.get('transcriptions'):
+                    # Add transcriptions (already in metadata.json) as text if requested
+                    if include_txt and export_data and export_data.get('transcriptions'):
                         for i, trans in enumerate(export_data['transcriptions']):
-                            trans_text = f"Language: {trans.get('language', 'unknown')}\n"
-                            trans_text += f"Confidence: {trans.get('confidence', 0)}\n\n"
-                            trans_text += trans.get('text', '')
-                            
-                            trans_content = trans_text.encode('utf-8')
+                            trans_content = _transcription_txt(trans)
                             trans_info = tarfile.TarInfo(name=f"{file_dir}/transcription_{i+1}.txt")
                             trans_info.size = len(trans_content)
                             tar.addfile(trans_info, io.BytesIO(trans_content))
                     
                     # Add lyrics
-                    if export_data and export_data.get('lyrics'):
+                    if include_txt and export_data and export_data.get('lyrics'):
                         for i, lyrics in enumerate(export_data['lyrics']):
                             if lyrics.get('lyrics_text'):
                                 lyrics_content = lyrics['lyrics_text'].encode('utf-8')
@@ -613,112 +1211,92 @@ class MusicAnalyzerExporter:
                                 )
                                 lyrics_info.size = len(lyrics_content)
                                 tar.addfile(lyrics_info, io.BytesIO(lyrics_content))
-            
-            # Read tar.gz content
-            with open(tar_path, 'rb') as f:
-                tar_content = f.read()
-            
-            # Generate filename
-            if len(music_files) == 1:
-                base_filename = Path(music_files[0].original_filename).stem
-            else:
-                base_filename = f"music_files_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-            
-            return {
-                'format': 'mono_tar.gz',
-                'content': tar_content,
-                'filename': f"{base_filename}_mono_complete.tar.gz",
-                'content_type': 'application/gzip'
-            }
-            
-        finally:
-            # Clean up temp file
-            if Path(tar_path).exists():
-                Path(tar_path).unlink()
+        
+        await asyncio.to_thread(write_archive)
+        
+        # Archive content (already written out when streaming)
+        tar_content = buf.getvalue() if buf is not None else None
+        
+        # Generate filename
+        if len(music_files) == 1:
+            base_filename = Path(music_files[0].original_filename).stem
+        else:
+            base_filename = f"music_files_{datetime.utcnow().strftime(FILENAME_TIMESTAMP_FORMAT)}"
+        
+        return {
+            'format': 'mono_tar.gz',
+            'content': tar_content,
+            'filename': f"{base_filename}_mono_complete{suffix}",
+            'content_type': content_type
+        }
     
-    async def _export_mono_files_tar_gz_batch(self, music_files: List[MusicFile], all_exports: List[Dict]) -> Dict[str, Any]:
-        """Export multiple mono files with metadata as tar.gz"""
-        from minio import Minio
+    async def _export_mono_files_tar_gz_batch(self, music_files: List[MusicFile], all_exports: List[Dict],
+                                              fileobj: Optional[BinaryIO] = None,
+                                              compresslevel: Optional[int] = None,
+                                              compressor: str = 'gzip',
+                                              include_txt: bool = False,
+                                              timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Export multiple mono files with metadata as tar.gz, see _export_mono_files_tar_gz
         
-        # Create temporary file for tar.gz
-        with tempfile.NamedTemporaryFile(suffix='.tar.gz', delete=False) as tmp_file:
-            tar_path = tmp_file.name
+        timestamp names the archive; it defaults to the current time.
+        """
+        if compresslevel is None:
+            compresslevel = MONO_TAR_COMPRESSLEVEL
+        compressor = _resolve_compressor(compressor)
+        suffix, content_type = ARCHIVE_TYPES[compressor]
+        # Build the archive in memory unless streaming to the caller
+        buf = io.BytesIO() if fileobj is None else None
         
-        try:
-            # Initialize MinIO client
-            minio_client = Minio(
-                f"{MINIO_CONFIG['host']}:{MINIO_CONFIG['port']}",
-                access_key=MINIO_CONFIG['access_key'],
-                secret_key=MINIO_CONFIG['secret_key'],
-                secure=MINIO_CONFIG['secure']
+        minio_client = self._get_minio_client()
+        
+        # Write the archive off the event loop; mono files missing locally are
+        # downloaded concurrently ahead of the writer
+        def write_archive():
+            local_monos = _existing_files(map(_local_mono_path, music_files))
+            mono_payloads = _iter_minio_payloads(
+                minio_client, music_files, partial(_missing_mono_object, local_monos=local_monos)
             )
-            
-            # Create tar.gz archive
-            with tarfile.open(tar_path, 'w:gz') as tar:
-                for i, (music_file, export_data) in enumerate(zip(music_files, all_exports)):
+            with closing(mono_payloads), \
+                    _open_tar_gz(buf if fileobj is None else fileobj, compresslevel, compressor) as tar:
+                for music_file, export_data, mono_data in zip(music_files, all_exports, mono_payloads):
                     # Create a directory for each file
                     file_dir = Path(music_file.original_filename).stem
                     
-                    # Add mono audio file if exists
-                    # Check for mono file in processed directory
-                    mono_path = Path(str(music_file.storage_path).replace('/original/', '/processed/'))
-                    mono_path = mono_path.with_suffix('.mono.wav')
-                    
-                    if mono_path.exists():
+                    # Add mono audio file from the processed directory
+                    if mono_data is None:
                         try:
-                            tar.add(mono_path, arcname=f"{file_dir}/mono.wav")
+                            _add_local_file(tar, _local_mono_path(music_file), f"{file_dir}/mono.wav")
                         except Exception as e:
                             print(f"Error adding mono file for {music_file.original_filename}: {e}")
                     else:
-                        # Try MinIO for mono file
+                        # Mono file fetched from MinIO
                         try:
-                            path_parts = Path(music_file.storage_path).parts
-                            if 'original' in path_parts:
-                                idx = path_parts.index('original')
-                                base_path = '/'.join(path_parts[idx+1:])
-                                minio_mono_path = f"processed/{Path(base_path).with_suffix('.mono.wav')}"
-                            else:
-                                genre = getattr(music_file, 'genre', 'unknown')
-                                minio_mono_path = f"processed/{genre}/{Path(music_file.storage_path).stem}.mono.wav"
-                            
-                            response = minio_client.get_object(
-                                MINIO_CONFIG.get('bucket_name', 'music-analyzer'),
-                                minio_mono_path
-                            )
-                            
-                            with tempfile.NamedTemporaryFile(suffix='_mono.wav', delete=False) as mono_tmp:
-                                mono_tmp.write(response.read())
-                                mono_tmp_path = mono_tmp.name
-                            
-                            response.close()
-                            response.release_conn()
-                            
-                            tar.add(mono_tmp_path, arcname=f"{file_dir}/mono.wav")
-                            Path(mono_tmp_path).unlink()
+                            if isinstance(mono_data, Exception):
+                                raise mono_data
                             
+                            mono_info = tarfile.TarInfo(name=f"{file_dir}/mono.wav")
+                            mono_info.size = len(mono_data)
+                            tar.addfile(mono_info, io.BytesIO(mono_data))
+                        
                         except Exception as e:
                             print(f"Error adding mono file for {music_file.original_filename} from MinIO: {e}")
                     
                     # Add metadata JSON
-                    metadata_content = json.dumps(export_data, indent=2).encode('utf-8')
+                    metadata_content = _json_bytes(export_data)
                     metadata_info = tarfile.TarInfo(name=f"{file_dir}/metadata.json")
                     metadata_info.size = len(metadata_content)
                     tar.addfile(metadata_info, io.BytesIO(metadata_content))
                     
-                    # Add transcriptions
-                    if export_data.get('transcriptions'):
+                    # Add transcriptions (already in metadata.json) as text if requested
+                    if include_txt and export_data.get('transcriptions'):
                         for j, trans in enumerate(export_data['transcriptions']):
-                            trans_text = f"Language: {trans.get('language', 'unknown')}\n"
-                            trans_text += f"Confidence: {trans.get('confidence', 0)}\n\n"
-                            trans_text += trans.get('text', '')
-                            
-                            trans_content = trans_text.encode('utf-8')
+                            trans_content = _transcription_txt(trans)
                             trans_info = tarfile.TarInfo(name=f"{file_dir}/transcription_{j+1}.txt")
                             trans_info.size = len(trans_content)
                             tar.addfile(trans_info, io.BytesIO(trans_content))
                     
                     # Add lyrics
-                    if export_data.get('lyrics'):
+                    if include_txt and export_data.get('lyrics'):
                         for j, lyrics in enumerate(export_data['lyrics']):
                             if lyrics.get('lyrics_text'):
                                 lyrics_content = lyrics['lyrics_text'].encode('utf-8')
@@ -727,29 +1305,33 @@ class MusicAnalyzerExporter:
                                 )
                                 lyrics_info.size = len(lyrics_content)
                                 tar.addfile(lyrics_info, io.BytesIO(lyrics_content))
-            
-            # Read tar.gz content
-            with open(tar_path, 'rb') as f:
-                tar_content = f.read()
-            
-            return {
-                'format': 'mono_tar.gz',
-                'content': tar_content,
-                'filename': f"batch_mono_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.tar.gz",
-                'content_type': 'application/gzip'
-            }
-            
-        finally:
-            # Clean up temp file
-            if Path(tar_path).exists():
-                Path(tar_path).unlink()
+        
+        await asyncio.to_thread(write_archive)
+        
+        # Archive content (already written out when streaming)
+        tar_content = buf.getvalue() if buf is not None else None
+        
+        if timestamp is None:
+            timestamp = datetime.utcnow().strftime(FILENAME_TIMESTAMP_FORMAT)
+        
+        return {
+            'format': 'mono_tar.gz',
+            'content': tar_content,
+            'filename': f"batch_mono_export_{timestamp}{suffix}",
+            'content_type': content_type
+        }
 
 # Create singleton instance
 _exporter = None
 
-def get_exporter() -> MusicAnalyzerExporter:
-    """Get or create exporter instance"""
+def get_exporter(db_manager: Optional[DatabaseManager] = None) -> MusicAnalyzerExporter:
+    """Get or create exporter instance
+    
+    Args:
+        db_manager: Database manager the exporter should share when it is first
+            created; by default it builds its own
+    """
     global _exporter
     if _exporter is None:
-        _exporter = MusicAnalyzerExporter()
+        _exporter = MusicAnalyzerExporter(db_manager)
     return _exporter
\ No newline at end of file
@@ -6,7 +6,7 @@ Adds V2 endpoints to existing Parakeet API
 import os
 import sys
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import asyncio
 import logging
 import uuid
@@ -34,6 +34,30 @@ from src.api.music_analyzer_api import (
 
 logger = logging.getLogger(__name__)
 
+def _directory_usage(root: Path) -> Tuple[int, int]:
+    """Count the files under root and sum their sizes
+    
+    Walks with os.scandir, so each entry is stat'ed at most once and nothing
+    is collected into a list.
+    
+    Returns:
+        (file count, total size in bytes)
+    """
+    count = size = 0
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        count += 1
+                        size += entry.stat().st_size
+        except OSError:
+            continue
+    return count, size
+
 def integrate_v2_endpoints(app, asr_model_ref):
     """
     Integrate V2 endpoints into existing FastAPI app
@@ -133,13 +157,13 @@ def integrate_v2_endpoints(app, asr_model_ref):
             "available_space": shutil.disk_usage("/").free
         }
         
-        # Count files in directories
-        for storage_type, path in STORAGE_PATHS.items():
-            if path.exists():
-                files = list(path.rglob("*"))
-                files = [f for f in files if f.is_file()]
-                stats[f"{storage_type}_files"]["count"] = len(files)
-                stats[f"{storage_type}_files"]["total_size"] = sum(f.stat().st_size for f in files)
+        # Count files in directories, walking the storage roots concurrently
+        usages = await asyncio.gather(*(
+            asyncio.to_thread(_directory_usage, path) for path in STORAGE_PATHS.values()
+        ))
+        for storage_type, (count, total_size) in zip(STORAGE_PATHS, usages):
+            stats[f"{storage_type}_files"]["count"] = count
+            stats[f"{storage_type}_files"]["total_size"] = total_size
         
         # Get database size
         async for db in db_manager.get_session():
@@ -192,10 +216,6 @@ def integrate_v2_endpoints(app, asr_model_ref):
                     )
                 )
             
-            # Count total
-            count_result = await db.execute(select(func.count()).select_from(query.subquery()))
-            total_count = count_result.scalar()
-            
             # Apply sorting
             sort_map = {
                 "filename": MusicFile.original_filename,
@@ -212,11 +232,22 @@ def integrate_v2_endpoints(app, asr_model_ref):
             
             # Apply pagination
             offset = (request.page - 1) * request.per_page
-            query = query.offset(offset).limit(request.per_page)
+            page_query = query.add_columns(func.count().over().label("total_count"))
+            page_query = page_query.offset(offset).limit(request.per_page)
             
-            # Execute query
-            result = await db.execute(query)
-            files = result.scalars().all()
+            # Execute query; the window count returns the filtered total with
+            # the page rows, saving a separate COUNT round-trip
+            result = await db.execute(page_query)
+            rows = result.all()
+            files = [row[0] for row in rows]
+            if rows:
+                total_count = rows[0].total_count
+            elif offset:
+                # Past the last page there are no rows to carry the total
+                count_result = await db.execute(select(func.count()).select_from(query.subquery()))
+                total_count = count_result.scalar()
+            else:
+                total_count = 0
             
             # Format response
             return {
@@ -263,17 +294,12 @@ def integrate_v2_endpoints(app, asr_model_ref):
             
             # Initialize MinIO
             global minio_client
-            from minio import Minio
-            minio_client = Minio(
-                MINIO_CONFIG["endpoint"],
-                access_key=MINIO_CONFIG["access_key"],
-                secret_key=MINIO_CONFIG["secret_key"],
-                secure=MINIO_CONFIG["secure"]
-            )
+            from src.managers.minio_client import get_minio_client
+            minio_client = get_minio_client()
             
             # Create bucket if not exists
-            if not minio_client.bucket_exists(MINIO_CONFIG["bucket_name"]):
-                minio_client.make_bucket(MINIO_CONFIG["bucket_name"])
+            if not await asyncio.to_thread(minio_client.bucket_exists, MINIO_CONFIG["bucket_name"]):
+                await asyncio.to_thread(minio_client.make_bucket, MINIO_CONFIG["bucket_name"])
                 logger.info(f"V2: Created MinIO bucket: {MINIO_CONFIG['bucket_name']}")
             
             # Update music_analyzer_api module with initialized clients
@@ -27,6 +27,19 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent
 os.chdir(PROJECT_ROOT)
 
+# Use the virtual environment's Python directly
+PYTHON_BIN = "/home/davegornshtein/parakeet-env/bin/python"
+
+def has_xdist():
+    """Check whether pytest-xdist is installed in the test environment"""
+    try:
+        result = subprocess.run(
+            [PYTHON_BIN, "-c", "import importlib.util, sys; sys.exit(importlib.util.find_spec('xdist') is None)"]
+        )
+    except OSError:
+        return False
+    return result.returncode == 0
+
 def run_command(cmd, description):
     """Run a command and return success status"""
     print(f"\n{'='*60}")
@@ -44,24 +57,18 @@ def run_command(cmd, description):
     
     return success
 
-def run_python_tests(test_type, coverage=False, verbose=False):
-    """Run Python tests with pytest"""
-    # Use the virtual environment's Python directly
-    python_bin = "/home/davegornshtein/parakeet-env/bin/python"
-    
-    pytest_cmd = f"{python_bin} -m pytest"
-    
-    # Add test directory
-    if test_type == "all":
-        pytest_cmd += " tests/"
-    elif test_type == "unit":
-        pytest_cmd += " tests/unit/"
-    elif test_type == "system":
-        pytest_cmd += " tests/system/"
-    elif test_type == "model":
-        pytest_cmd += " tests/model/"
-    elif test_type == "component":
-        pytest_cmd += " tests/component/"
+def run_python_tests(test_types, coverage=False, verbose=False, parallel=False):
+    """Run the selected Python test suites with pytest
+    
+    All suites go to a single pytest process, so interpreter startup, plugin
+    loading and collection are paid once rather than once per suite. With
+    parallel, test files are sharded across all cores with pytest-xdist.
+    """
+    pytest_cmd = f"{PYTHON_BIN} -m pytest"
+    
+    # Add test directories
+    for test_type in test_types:
+        pytest_cmd += f" tests/{test_type}/"
     
     # Add options
     if verbose:
@@ -69,9 +76,12 @@ def run_python_tests(test_type, coverage=False, verbose=False):
     if coverage:
         pytest_cmd += " --cov=src --cov-report=html --cov-report=term"
     
-    pytest_cmd += " --tb=short"
+    if parallel:
+        pytest_cmd += " -n auto --dist=loadfile"
+    
+    pytest_cmd += " --tb=short -p no:cacheprovider"
     
-    return run_command(pytest_cmd, f"Python {test_type} tests")
+    return run_command(pytest_cmd, f"Python {', '.join(test_types)} tests")
 
 def run_ui_tests():
     """Run UI tests with npm"""
@@ -101,19 +111,19 @@ def main():
     
     results = []
     
-    # Run selected tests
-    if args.all or args.unit:
-        results.append(("Unit Tests", run_python_tests("unit", args.coverage, args.verbose)))
-    
-    if args.all or args.system:
-        results.append(("System Tests", run_python_tests("system", args.coverage, args.verbose)))
+    # Run selected tests; CPU suites run in parallel when pytest-xdist is available
+    test_types = [
+        test_type for test_type in ("unit", "system", "component")
+        if args.all or getattr(args, test_type)
+    ]
     
-    if args.all or args.component:
-        results.append(("Component Tests", run_python_tests("component", args.coverage, args.verbose)))
+    if test_types:
+        results.append(("Python Tests", run_python_tests(test_types, args.coverage, args.verbose, has_xdist())))
     
+    # Model tests share the GPU, so they run on their own in a single worker
     if args.all or args.model:
         print("\n⚠️  Model tests require significant GPU memory and may fail on systems with limited resources")
-        results.append(("Model Tests", run_python_tests("model", args.coverage, args.verbose)))
+        results.append(("Model Tests", run_python_tests(["model"], args.coverage, args.verbose)))
     
     if args.all or args.ui:
         results.append(("UI Tests", run_ui_tests()))
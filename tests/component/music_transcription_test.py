@@ -4,10 +4,12 @@
 Comprehensive music transcription test with all FLAC files
 """
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import os
 from dotenv import load_dotenv
 
@@ -18,19 +20,29 @@ load_dotenv(".env.test")
 API_URL = os.getenv("TEST_API_URL", "http://localhost:8000")
 USERNAME = os.getenv("API_USERNAME", "parakeet")
 PASSWORD = os.getenv("API_PASSWORD", "Q7+sKsoPWJH5vuulfY+RuQSmUyZj3jBa09Ql5om32hI=")
+# Transcription requests in flight at once
+MAX_WORKERS = int(os.getenv("TEST_CONCURRENCY", "4"))
 
 # Get all FLAC files
 flac_dir = Path("/home/davegornshtein/parakeet-tdt-deployment/music_library/other")
 flac_files = sorted(flac_dir.glob("*.flac"))
 
-def transcribe_file(file_path: Path) -> Dict:
+def create_session() -> requests.Session:
+    """Authenticated keep-alive session with a connection per worker"""
+    session = requests.Session()
+    session.auth = (USERNAME, PASSWORD)
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def transcribe_file(session: requests.Session, file_path: Path) -> Dict:
     """Transcribe a single file"""
     with open(file_path, 'rb') as f:
         files = {'file': (file_path.name, f, 'audio/flac')}
         
-        response = requests.post(
+        response = session.post(
             f"{API_URL}/transcribe",
-            auth=(USERNAME, PASSWORD),
             files=files
         )
         
@@ -75,38 +87,51 @@ def main():
     print(f"\nFound {len(flac_files)} FLAC files to process\n")
     
     results = []
+    test_files = flac_files[:10]  # Limit to first 10 files
     
-    # Process each file
-    for i, file_path in enumerate(flac_files[:10], 1):  # Limit to first 10 files
-        song_info = extract_song_info(file_path.name)
-        print(f"\n[{i}/{min(len(flac_files), 10)}] Processing: {song_info['clean_name']}")
-        print(f"      File: {file_path.name}")
-        print(f"      Size: {file_path.stat().st_size / 1024**2:.1f} MB")
-        
-        # Transcribe
+    def timed_transcribe(session: requests.Session, file_path: Path) -> Tuple[Dict, float]:
         start_time = time.time()
-        transcription = transcribe_file(file_path)
-        total_time = time.time() - start_time
-        
-        if "error" in transcription:
-            print(f"      ✗ Error: {transcription['error']}")
-            continue
-        
-        # Analyze
-        analysis = analyze_transcription(transcription, song_info)
-        results.append(analysis)
-        
-        # Print results
-        print(f"      ✓ Success! Processed in {total_time:.1f}s")
-        print(f"      - Audio duration: {analysis['duration']:.1f}s")
-        print(f"      - Processing speed: {analysis['speed_factor']:.1f}x realtime")
-        print(f"      - Text detected: {'Yes' if analysis['has_text'] else 'No'}")
-        if analysis['has_text']:
-            print(f"      - Words: {analysis['word_count']}")
-            print(f"      - Preview: {analysis['text_preview']}")
-        
-        # Small delay between files
-        time.sleep(1)
+        transcription = transcribe_file(session, file_path)
+        return transcription, time.time() - start_time
+    
+    # Send the files concurrently and report each as it finishes
+    with create_session() as session, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(timed_transcribe, session, file_path): file_path
+            for file_path in test_files
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            file_path = futures[future]
+            song_info = extract_song_info(file_path.name)
+            print(f"\n[{i}/{len(test_files)}] Processed: {song_info['clean_name']}")
+            print(f"      File: {file_path.name}")
+            print(f"      Size: {file_path.stat().st_size / 1024**2:.1f} MB")
+            
+            try:
+                transcription, total_time = future.result()
+            except requests.RequestException as e:
+                transcription = {"error": str(e)}
+            
+            if "error" in transcription:
+                print(f"      ✗ Error: {transcription['error']}")
+                continue
+            
+            # Analyze
+            analysis = analyze_transcription(transcription, song_info)
+            results.append(analysis)
+            
+            # Print results
+            print(f"      ✓ Success! Processed in {total_time:.1f}s")
+            print(f"      - Audio duration: {analysis['duration']:.1f}s")
+            print(f"      - Processing speed: {analysis['speed_factor']:.1f}x realtime")
+            print(f"      - Text detected: {'Yes' if analysis['has_text'] else 'No'}")
+            if analysis['has_text']:
+                print(f"      - Words: {analysis['word_count']}")
+                print(f"      - Preview: {analysis['text_preview']}")
+    
+    # Keep the report in file order regardless of completion order
+    file_order = {file_path.name: i for i, file_path in enumerate(test_files)}
+    results.sort(key=lambda r: file_order[r['filename']])
     
     # Summary report
     print("\n" + "=" * 80)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# Copyright © 2025 David Gornshtein @Eveara Ltd. All rights reserved.
+"""
+Unit tests for the archive and download helpers behind the exporter
+"""
+import io
+import os
+import shutil
+import tarfile
+
+import pytest
+
+from src.utils.music_analyzer_export import (
+    _add_local_file,
+    _canonical_file_id,
+    _existing_files,
+    _iter_minio_payloads,
+    _open_tar_gz,
+    _open_tar_piped,
+    _transcription_txt,
+    _write_system_tar,
+)
+
+
+def _members(fileobj, mode='r:*'):
+    """Map member name -> content of a tar read from fileobj"""
+    fileobj.seek(0)
+    with tarfile.open(fileobj=fileobj, mode=mode) as tar:
+        return {member.name: tar.extractfile(member).read() for member in tar}
+
+
+def _add_bytes(tar, name, data):
+    """Add an in-memory member to tar"""
+    info = tarfile.TarInfo(name=name)
+    info.size = len(data)
+    tar.addfile(info, io.BytesIO(data))
+
+
+@pytest.mark.parametrize("compresslevel", [0, 1, 6])
+def test_open_tar_gz_roundtrip(tmp_path, compresslevel):
+    """The gzip writer produces a tar.gz the stock tarfile reads back"""
+    local = tmp_path / "song.wav"
+    local.write_bytes(os.urandom(70000))
+    
+    out = io.BytesIO()
+    with _open_tar_gz(out, compresslevel) as tar:
+        _add_local_file(tar, local, "song.wav")
+        _add_bytes(tar, "metadata.json", b'{"id": 1}')
+    
+    assert out.getvalue()[:2] == b'\x1f\x8b'
+    assert _members(out, 'r:gz') == {
+        "song.wav": local.read_bytes(),
+        "metadata.json": b'{"id": 1}',
+    }
+
+
+@pytest.mark.skipif(shutil.which('pigz') is None, reason="pigz not installed")
+def test_open_tar_gz_pigz(tmp_path):
+    """pigz output is plain gzip"""
+    out = io.BytesIO()
+    with _open_tar_gz(out, 6, 'pigz') as tar:
+        _add_bytes(tar, "a.txt", b"hello")
+    
+    assert _members(out, 'r:gz') == {"a.txt": b"hello"}
+
+
+@pytest.mark.parametrize("to_file", [True, False])
+def test_open_tar_piped(tmp_path, to_file):
+    """Piped tars carry local files (sendfile) and in-memory members
+    
+    A real file receives the compressor's output directly; a BytesIO is fed
+    by a copier thread.
+    """
+    local = tmp_path / "song.wav"
+    # Not a multiple of the tar block size, so padding is exercised
+    local.write_bytes(os.urandom(3 * tarfile.BLOCKSIZE + 17))
+    
+    out = open(tmp_path / "out.tar", 'w+b') if to_file else io.BytesIO()
+    with out:
+        with _open_tar_piped(['cat'], out) as tar:
+            _add_local_file(tar, local, "song.wav")
+            _add_bytes(tar, "lyrics.txt", b"la la la")
+        
+        assert _members(out, 'r:') == {
+            "song.wav": local.read_bytes(),
+            "lyrics.txt": b"la la la",
+        }
+
+
+def test_open_tar_piped_failure(tmp_path):
+    """A failing compressor is reported"""
+    # Consume the whole stream before failing, so the writer never sees EPIPE
+    with pytest.raises(RuntimeError):
+        with _open_tar_piped(['sh', '-c', 'cat > /dev/null; exit 3'], io.BytesIO()):
+            pass
+
+
+def test_add_local_file_header(tmp_path):
+    """Members take size, mtime and mode from the file but carry no owner"""
+    local = tmp_path / "song.wav"
+    local.write_bytes(b"RIFF0000")
+    os.chmod(local, 0o640)
+    os.utime(local, (1700000000, 1700000000))
+    
+    out = io.BytesIO()
+    with tarfile.open(fileobj=out, mode='w') as tar:
+        _add_local_file(tar, local, "renamed.wav")
+    
+    out.seek(0)
+    with tarfile.open(fileobj=out, mode='r') as tar:
+        member = tar.getmember("renamed.wav")
+    assert member.size == 8
+    assert member.mtime == 1700000000
+    assert member.mode == 0o640
+    assert member.uname == ""
+
+
+@pytest.mark.skipif(shutil.which('tar') is None or shutil.which('gzip') is None,
+                    reason="tar or gzip not installed")
+@pytest.mark.parametrize("to_file", [True, False])
+async def test_write_system_tar(tmp_path, to_file):
+    """The system tar archives each path under its member name"""
+    first = tmp_path / "a" / "track.wav"
+    second = tmp_path / "b" / "track.wav"
+    for path in (first, second):
+        path.parent.mkdir()
+        path.write_bytes(os.urandom(1000))
+    
+    files = {"first.wav": str(first), "second.wav": str(second)}
+    out = open(tmp_path / "out.tar.gz", 'w+b') if to_file else io.BytesIO()
+    with out:
+        assert await _write_system_tar(files, out, compresslevel=0)
+        assert _members(out, 'r:gz') == {
+            "first.wav": first.read_bytes(),
+            "second.wav": second.read_bytes(),
+        }
+
+
+async def test_write_system_tar_rejects_nested_names(tmp_path):
+    """Member names that cannot be staged are left to the tarfile fallback"""
+    out = io.BytesIO()
+    assert not await _write_system_tar({"dir/a.wav": str(tmp_path)}, out, 6)
+    assert out.getvalue() == b""
+
+
+def test_existing_files(tmp_path):
+    """Only existing regular files are returned, listed or stat'ed"""
+    (tmp_path / "a.wav").write_bytes(b"")
+    (tmp_path / "b.wav").write_bytes(b"")
+    (tmp_path / "dir.wav").mkdir()
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "c.wav").write_bytes(b"")
+    
+    paths = [tmp_path / "a.wav", tmp_path / "b.wav", tmp_path / "missing.wav",
+             tmp_path / "dir.wav", other / "c.wav", tmp_path / "gone" / "d.wav",
+             tmp_path / "gone" / "e.wav"]
+    
+    assert _existing_files(paths) == {tmp_path / "a.wav", tmp_path / "b.wav", other / "c.wav"}
+
+
+class _FakeResponse:
+    def __init__(self, data):
+        self.data = data
+    
+    def read(self):
+        return self.data
+    
+    def close(self):
+        pass
+    
+    def release_conn(self):
+        pass
+
+
+class _FakeMinio:
+    """Serves object names back as their content, failing on 'bad'"""
+    
+    def get_object(self, bucket, object_name):
+        if object_name == "bad":
+            raise IOError("download failed")
+        return _FakeResponse(object_name.encode())
+
+
+def test_iter_minio_payloads_order():
+    """Payloads come back in item order, with skips and errors in place"""
+    items = [f"obj{i}" for i in range(100)] + ["skip", "bad", "last"]
+    
+    payloads = list(_iter_minio_payloads(
+        _FakeMinio(), items, lambda item: None if item == "skip" else item
+    ))
+    
+    assert payloads[:100] == [f"obj{i}".encode() for i in range(100)]
+    assert payloads[100] is None
+    assert isinstance(payloads[101], IOError)
+    assert payloads[102] == b"last"
+
+
+def test_transcription_txt():
+    """Transcription text files carry language and confidence headers"""
+    body = _transcription_txt({'language': 'he', 'confidence': 0.9, 'text': 'שלום'})
+    
+    assert body == "Language: he\nConfidence: 0.9\n\nשלום".encode('utf-8')
+    assert _transcription_txt({}) == b"Language: unknown\nConfidence: 0\n\n"
+
+
+def test_canonical_file_id():
+    """Requested ids map to the UUID strings the database returns"""
+    file_id = "0f8fad5b-d9cb-469f-a165-70867728950e"
+    
+    assert _canonical_file_id(file_id) == file_id
+    assert _canonical_file_id(file_id.upper()) == file_id
+    assert _canonical_file_id(file_id.replace("-", "")) == file_id
+    assert _canonical_file_id("not-a-uuid") is None
+    assert _canonical_file_id("") is None
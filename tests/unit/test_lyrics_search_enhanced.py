@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# Copyright © 2025 David Gornshtein @Eveara Ltd. All rights reserved.
+"""
+Unit tests for the enhanced lyrics search parsers and search cache
+"""
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+from src.utils.lyrics_search_enhanced import (
+    EnhancedLyricsSearchManager,
+    _parse_quality_score,
+)
+
+
+def _manager():
+    """A manager for the pure parsers, without loading Gemma"""
+    return EnhancedLyricsSearchManager.__new__(EnhancedLyricsSearchManager)
+
+
+def _brave_data(*results):
+    """Wrap (url, title) pairs as a Brave API response"""
+    return {"web": {"results": [
+        {"url": url, "title": title, "description": "..."} for url, title in results
+    ]}}
+
+
+@pytest.mark.parametrize("response, expected", [
+    ("Quality score (1-10): 7", 7),
+    ("Quality: 1-10 scale, I give 6", 6),
+    ("Quality: 8/10", 8),
+    ("I'd rate the quality 9 out of 10.", 9),
+    ("Quality score (1-10): 7, about 3 verses are shown", 7),
+    ("quality (1 to 10) = 10", 10),
+    ("Quality rating is 6.", 6),
+    ("Quality:\n4\n1. Yes, these are lyrics", 4),
+])
+def test_parse_quality_score(response, expected):
+    """Scores are read in the formats Gemma answers the prompt with"""
+    assert _parse_quality_score(response) == expected
+
+
+@pytest.mark.parametrize("response", [
+    "No rating given",
+    "Quality\n1. Does this contain lyrics? Yes",
+    "Quality: 7.5",
+    "Quality: 11",
+])
+def test_parse_quality_score_without_score(response):
+    """List numbers, decimals and out-of-range values are not scores"""
+    assert _parse_quality_score(response) is None
+
+
+def test_parse_brave_results_prefers_full_match():
+    """The result naming both artist and title wins and is a clear match"""
+    manager = _manager()
+    result = manager._parse_brave_results(_brave_data(
+        ("https://www.azlyrics.com/lyrics/sting/other.html", "Sting - Fields of Gold"),
+        ("https://genius.com/Sting-englishman-in-new-york-lyrics", "Sting – Englishman in New York Lyrics"),
+    ), "Sting", "Englishman in New York")
+    
+    assert result["site"] == "Genius"
+    assert result["confidence"] == 1.0
+    assert "_skip_tavily_hint" not in result
+    assert manager._is_clear_brave_match(result)
+
+
+def test_parse_brave_results_artist_only_is_not_clear_match():
+    """A lyrics-site hit matching only the artist still goes to Gemma/Tavily"""
+    manager = _manager()
+    result = manager._parse_brave_results(_brave_data(
+        ("https://genius.com/artists/Sting", "Sting Lyrics, Songs, and Albums"),
+    ), "Sting", "Englishman in New York")
+    
+    assert result["confidence"] == 0.75
+    assert not manager._is_clear_brave_match(result)
+
+
+def test_parse_brave_results_ignores_other_sites():
+    """Only whitelisted lyrics sites are returned"""
+    result = _manager()._parse_brave_results(_brave_data(
+        ("https://example.com/sting-englishman", "Sting - Englishman in New York"),
+        ("https://www.lyrics.com/lyric/1/Sting", "Sting - Englishman in New York"),
+    ), "Sting", "Englishman in New York")
+    
+    assert result is None
+
+
+def _cached_manager(size=2):
+    """A manager with an empty search cache holding at most size songs"""
+    manager = _manager()
+    manager.SEARCH_CACHE_SIZE = size
+    manager._search_cache = OrderedDict()
+    manager._inflight = {}
+    return manager
+
+
+def _done_search(result):
+    """A finished search task returning result"""
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(result)
+    return future
+
+
+async def test_search_cache_evicts_least_recent():
+    """Found results are cached up to SEARCH_CACHE_SIZE songs"""
+    manager = _cached_manager()
+    for title in ("a", "b", "c"):
+        manager._finish_search(("x", title, False), _done_search({"best_source": "brave"}))
+    
+    assert list(manager._search_cache) == [("x", "b", False), ("x", "c", False)]
+
+
+async def test_search_cache_skips_failed_searches():
+    """Searches that found nothing are not pinned in the cache"""
+    manager = _cached_manager()
+    manager._inflight[("x", "a", False)] = object()
+    manager._finish_search(("x", "a", False), _done_search({"results": {}}))
+    
+    assert not manager._search_cache
+    assert not manager._inflight
+
+
+async def test_concurrent_searches_share_one_lookup():
+    """Concurrent and repeated searches for a song run one lookup"""
+    manager = _cached_manager()
+    calls = []
+    
+    async def search_uncached(artist, title, cheap_mode):
+        calls.append((artist, title, cheap_mode))
+        await asyncio.sleep(0)
+        return {"best_source": "brave", "results": {"brave": {"title": title}}}
+    
+    manager._search_uncached = search_uncached
+    first, second = await asyncio.gather(
+        manager.search_lyrics_intelligent("Sting", "Fields of Gold"),
+        manager.search_lyrics_intelligent(" sting", "fields of gold "),
+    )
+    third = await manager.search_lyrics_intelligent("STING", "Fields Of Gold")
+    
+    assert calls == [("Sting", "Fields of Gold", False)]
+    assert first == second == third
+    # Callers get their own copies of the cached result
+    first["results"]["brave"]["title"] = "changed"
+    assert third["results"]["brave"]["title"] == "Fields of Gold"
+
+
+async def test_cheap_and_full_searches_are_kept_apart():
+    """A cheap (Brave-first) result is never reused for a full search"""
+    manager = _cached_manager()
+    calls = []
+    
+    async def search_uncached(artist, title, cheap_mode):
+        calls.append(cheap_mode)
+        await asyncio.sleep(0)
+        return {"best_source": "brave", "results": {}, "cheap": cheap_mode}
+    
+    manager._search_uncached = search_uncached
+    cheap, full = await asyncio.gather(
+        manager.search_lyrics_intelligent("Sting", "Fields of Gold", cheap_mode=True),
+        manager.search_lyrics_intelligent("Sting", "Fields of Gold"),
+    )
+    again = await manager.search_lyrics_intelligent("Sting", "Fields of Gold")
+    
+    assert sorted(calls) == [False, True]
+    assert cheap["cheap"] and not full["cheap"] and not again["cheap"]